@@ -0,0 +1,352 @@
+"""
+Memory-compact in-memory results.
+
+`generate_data` returns one dict per record, which repeats the field names
+and pays a dict's overhead on every row, several times the size of the
+values themselves. A RecordBatch holds the same records column by column:
+
+* integer columns (e.g. "Number") in an `array` of 64-bit ints and boolean
+  columns in a `bytearray`, instead of a list of int objects
+* UUID strings as their 16 bytes, instead of a 36-character string each
+* nested values ("Credit Card") as one column per part
+* string columns with few distinct values (names, birth dates, card
+  expiry dates, pooled fields) store every distinct string once; columns
+  with more than INTERN_LIMIT distinct values (emails, addresses) stop
+  checking once they reach it
+
+Records are rebuilt on demand: indexing returns a dict, iterating yields
+dicts, and `chunks` hands them to the exporters a chunk at a time, so
+writing a batch out never holds more than one chunk of dicts.
+"""
+
+from array import array
+from itertools import islice
+
+from data_generator import DEFAULT_CHUNK_SIZE
+
+# Distinct strings a column interns before it gives up on interning
+INTERN_LIMIT = 1 << 16
+
+# Where the dashes of a UUID string are
+_UUID_DASHES = (8, 13, 18, 23)
+
+class _Column:
+    """
+    One column of a RecordBatch.
+
+    The storage is picked from the first values appended: "int", "bool",
+    "uuid" (canonical UUID strings, stored as 16 bytes each), "nested"
+    (dicts with the same keys, stored as part columns) or "object" (a
+    list). A column falls back to "object" if later values don't fit.
+    """
+
+    __slots__ = ("kind", "values", "parts", "_interned")
+
+    def __init__(self):
+        self.kind = None
+        self.values = []
+        self.parts = None
+        self._interned = None
+
+    def extend(self, values):
+        """Append a list of values"""
+        if not values:
+            return
+        if self.kind is None:
+            self._start(values)
+
+        if self.kind == "nested":
+            keys = tuple(self.parts)
+            if all(type(value) is dict and tuple(value) == keys for value in values):
+                for key, part in self.parts.items():
+                    part.extend([value[key] for value in values])
+                return
+        elif self.kind == "int":
+            if all(type(value) is int for value in values):
+                try:
+                    # Converted in full first, so an overflow leaves the column as it was
+                    self.values.extend(array("q", values))
+                    return
+                except OverflowError:
+                    pass
+        elif self.kind == "bool":
+            if all(type(value) is bool for value in values):
+                self.values.extend(values)
+                return
+        elif self.kind == "uuid":
+            packed = _pack_uuids(values)
+            if packed is not None:
+                self.values.extend(packed)
+                return
+        else:
+            self.values.extend(self._intern(values))
+            return
+
+        # The values don't fit the column's storage
+        self._to_objects()
+        self.values.extend(self._intern(values))
+
+    def get(self, index):
+        """Value at a (non-negative) row index"""
+        if self.kind == "nested":
+            return {key: part.get(index) for key, part in self.parts.items()}
+        if self.kind == "bool":
+            return bool(self.values[index])
+        if self.kind == "uuid":
+            return _format_uuid(self.values[16 * index:16 * index + 16])
+        return self.values[index]
+
+    def iter(self, start=0, stop=None):
+        """Iterate over the values of a range of rows"""
+        if self.kind == "nested":
+            keys = tuple(self.parts)
+            parts = [part.iter(start, stop) for part in self.parts.values()]
+            return (dict(zip(keys, values)) for values in zip(*parts))
+        if self.kind == "uuid":
+            data = self.values
+            start, stop, _ = slice(start, stop).indices(len(data) // 16)
+            return (_format_uuid(data[16 * index:16 * index + 16]) for index in range(start, stop))
+        values = islice(self.values, start, stop)
+        if self.kind == "bool":
+            return map(bool, values)
+        return values
+
+    def slice(self, start, stop):
+        """Copy of a range of rows, as a new column"""
+        column = _Column()
+        column.kind = self.kind
+        if self.kind == "nested":
+            column.parts = {key: part.slice(start, stop) for key, part in self.parts.items()}
+        elif self.kind == "uuid":
+            column.values = self.values[16 * start:16 * stop]
+        else:
+            column.values = self.values[start:stop]
+        return column
+
+    def _start(self, values):
+        """Pick the storage from the first values"""
+        first = values[0]
+        if type(first) is dict and first:
+            self.kind = "nested"
+            self.parts = {key: _Column() for key in first}
+        elif type(first) is bool:
+            self.kind = "bool"
+            self.values = bytearray()
+        elif type(first) is int:
+            self.kind = "int"
+            self.values = array("q")
+        elif _pack_uuids(values[:1]) is not None:
+            self.kind = "uuid"
+            self.values = bytearray()
+        else:
+            self.kind = "object"
+            self.values = []
+            self._interned = {}
+
+    def _to_objects(self):
+        """Switch to a plain list, keeping the values stored so far"""
+        values = list(self.iter())
+        self.kind = "object"
+        self.values = values
+        self.parts = None
+        self._interned = None
+
+    def _intern(self, values):
+        """Replace strings with an equal one already stored, while that pays off"""
+        interned = self._interned
+        if interned is None:
+            return values
+        setdefault = interned.setdefault
+        values = [setdefault(value, value) if type(value) is str else value for value in values]
+        if len(interned) > INTERN_LIMIT:
+            # Too many distinct values to be worth it; stop checking
+            self._interned = None
+        return values
+
+def _pack_uuids(values):
+    """
+    Pack canonical (lowercase, dashed) UUID strings into 16 bytes each.
+
+    Returns:
+        bytes: The packed UUIDs, or None if any value isn't one
+    """
+    packed = bytearray()
+    for value in values:
+        if (type(value) is not str or len(value) != 36 or value != value.lower()
+                or any(value[index] != "-" for index in _UUID_DASHES)):
+            return None
+        try:
+            packed += bytes.fromhex(value.replace("-", ""))
+        except ValueError:
+            return None
+    return packed
+
+def _format_uuid(data):
+    """Format 16 packed bytes as a UUID string"""
+    digits = data.hex()
+    return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
+
+class RecordBatch:
+    """
+    Records stored column by column.
+
+    Behaves like a read-only sequence of record dicts: `len(batch)`,
+    `batch[i]` (a dict, negative indexes allowed), `batch[i:j]` (a new
+    batch) and iteration. `column(name)` returns one field's values.
+
+    Args:
+        names (list): Field names, in order
+        fields (list): Field definitions, used by the exporters (e.g. to
+            flatten nested fields in CSV); optional
+    """
+
+    __slots__ = ("names", "fields", "_columns", "_length")
+
+    def __init__(self, names, fields=None):
+        self.names = tuple(names)
+        self.fields = [dict(field) for field in fields] if fields else None
+        self._columns = [_Column() for _ in self.names]
+        self._length = 0
+
+    @classmethod
+    def from_chunks(cls, chunks, fields=None):
+        """
+        Build a batch from chunks of record dicts, e.g. from
+        `iter_record_chunks` or `parallel.iter_parallel_chunks`.
+
+        Each chunk is packed into the batch as it arrives, so only one
+        chunk of dicts is held at a time.
+
+        Args:
+            chunks (iterable): Lists of record dicts
+            fields (list): Field definitions; without them the names are
+                taken from the first record
+
+        Returns:
+            RecordBatch: The records
+        """
+        batch = None
+        if fields:
+            batch = cls([field["name"] for field in fields], fields)
+        for chunk in chunks:
+            if batch is None:
+                if not chunk:
+                    continue
+                batch = cls(list(chunk[0]))
+            batch.extend(chunk)
+        return batch if batch is not None else cls([])
+
+    def extend(self, records):
+        """Append a list of record dicts"""
+        self.extend_columns([[record[name] for record in records] for name in self.names])
+
+    def extend_columns(self, columns):
+        """Append rows given as one list of values per field, in field order"""
+        if len(columns) != len(self.names):
+            raise ValueError(f"Expected {len(self.names)} columns, got {len(columns)}")
+        lengths = {len(values) for values in columns}
+        if len(lengths) > 1:
+            raise ValueError("Columns must all have the same length")
+        for column, values in zip(self._columns, columns):
+            column.extend(values)
+        self._length += lengths.pop() if lengths else 0
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                raise ValueError("RecordBatch slices don't support a step")
+            batch = RecordBatch(self.names, self.fields)
+            batch._columns = [column.slice(start, max(start, stop)) for column in self._columns]
+            batch._length = max(stop - start, 0)
+            return batch
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("RecordBatch index out of range")
+        return {name: column.get(index) for name, column in zip(self.names, self._columns)}
+
+    def __iter__(self):
+        return self.records()
+
+    def __repr__(self):
+        return f"RecordBatch({self._length} records, fields={list(self.names)})"
+
+    def column(self, name):
+        """
+        Values of one field.
+
+        Args:
+            name (str): Field name
+
+        Returns:
+            list: The field's values, in row order
+        """
+        if name not in self.names:
+            raise KeyError(name)
+        return list(self._columns[self.names.index(name)].iter())
+
+    def rows(self, start=0, stop=None):
+        """Iterate over a range of rows as tuples of values, in field order"""
+        return zip(*[column.iter(start, stop) for column in self._columns])
+
+    def records(self, start=0, stop=None):
+        """Iterate over a range of rows as record dicts"""
+        names = self.names
+        return (dict(zip(names, values)) for values in self.rows(start, stop))
+
+    def to_dicts(self):
+        """All records as a list of dicts, like `generate_data` returns"""
+        return list(self.records())
+
+    def chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Iterate over the records in lists of up to `chunk_size` dicts.
+
+        This is the input the exporters take, so a batch can be written
+        with e.g. `export_records(batch.chunks(), path, "CSV", batch.fields)`.
+        """
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be a positive number")
+        for start in range(0, self._length, chunk_size):
+            yield list(self.records(start, start + chunk_size))
+
+    def write(self, stream, export_format, chunk_size=DEFAULT_CHUNK_SIZE, **options):
+        """
+        Write the records to an open binary stream.
+
+        Args:
+            stream: Binary stream to write to; left open
+            export_format (str): One of exporters.EXPORT_FORMATS (except
+                the database formats)
+            chunk_size (int): Records converted to dicts at a time
+            **options: Format specific writer options
+
+        Returns:
+            int: Number of records written
+        """
+        from exporters import open_writer
+
+        with open_writer(stream, export_format, self.fields, **options) as writer:
+            for chunk in self.chunks(chunk_size):
+                writer.write_chunk(chunk)
+        return writer.records_written
+
+    def export(self, output_file, export_format, **options):
+        """
+        Write the records to a file with `exporters.export_records`.
+
+        Compression, progress reporting and the other export options work
+        as they do there.
+
+        Returns:
+            int: Number of records written
+        """
+        from exporters import export_records
+
+        return export_records(self.chunks(), output_file, export_format, self.fields,
+                              total=self._length, **options)
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the User Data Generator.
+
+Measures generation and export throughput so a change can be checked for
+regressions before it is merged:
+
+    python benchmarks.py                          # every suite
+    python benchmarks.py --suite fields --rows 5000
+    python benchmarks.py --json after.json --compare before.json
+
+Suites:
+    dispatch  compiled schema vs. per-value dispatch
+    columns   vectorized NumPy columns vs. scalar generators
+    fields    rows/sec for every supported field type
+    export    end-to-end generate + export for each format, generation mode
+              and size, including peak RSS
+    startup   cold start: module imports, the headless CLI and the GUI
+              window, each timed in a fresh interpreter
+
+Export benchmarks each run in a fresh process so their peak RSS is their
+own. `--json` writes machine-readable results, and `--compare` diffs them
+against an earlier results file and exits non-zero when a benchmark got
+slower than `--threshold` allows.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from data_generator import (
+    FIELD_GENERATORS, FIELD_TYPES, GeneratorContext, compile_schema, iter_record_chunks,
+)
+from exporters import EXPORT_FORMATS, JSONSerializer, export_records
+from parallel import iter_parallel_chunks
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then not reported
+    resource = None
+
+# A representative ten-column schema mixing cheap and expensive types
+BENCH_FIELDS = [
+    {"name": "id", "type": "UUID"},
+    {"name": "first_name", "type": "First Name"},
+    {"name": "last_name", "type": "Last Name"},
+    {"name": "email", "type": "Email"},
+    {"name": "phone", "type": "Phone Number"},
+    {"name": "city", "type": "City"},
+    {"name": "dob", "type": "Date of Birth"},
+    {"name": "score", "type": "Number"},
+    {"name": "active", "type": "Boolean"},
+    {"name": "website", "type": "URL"},
+]
+
+# Types that are cheap to produce, where dispatch overhead dominates
+CHEAP_FIELDS = [
+    {"name": "id", "type": "UUID"},
+    {"name": "score", "type": "Number"},
+    {"name": "active", "type": "Boolean"},
+    {"name": "country", "type": "Country"},
+    {"name": "postcode", "type": "Postal Code"},
+    {"name": "job", "type": "Job Title"},
+]
+
+SCHEMAS = {"mixed": BENCH_FIELDS, "cheap": CHEAP_FIELDS}
+
+# Seeding-style schema for the export benchmarks; the slow Faker types are
+# pooled so million-row runs finish in reasonable time
+EXPORT_FIELDS = [
+    {"name": "id", "type": "UUID"},
+    {"name": "first_name", "type": "First Name", "pool": 5000},
+    {"name": "last_name", "type": "Last Name", "pool": 5000},
+    {"name": "email", "type": "Email", "pool": 20000},
+    {"name": "city", "type": "City", "pool": 2000},
+    {"name": "country", "type": "Country"},
+    {"name": "dob", "type": "Date of Birth"},
+    {"name": "score", "type": "Number"},
+    {"name": "active", "type": "Boolean"},
+    {"name": "card", "type": "Credit Card", "pool": 1000},
+]
+
+# Cold start cases, each a command run in a fresh interpreter. The GUI
+# window case exits with SKIP_EXIT_CODE where no display is available.
+SKIP_EXIT_CODE = 3
+STARTUP_CASES = {
+    "import cli": ["-c", "import cli"],
+    "import gui": ["-c", "import gui"],
+    "cli --list-types": ["main.py", "--headless", "--list-types"],
+    "cli 100 rows": ["main.py", "--headless", "--field", "name:Full Name", "--field", "email:Email",
+                     "--count", "100", "--seed", "0", "-o", os.devnull],
+    "gui window": ["-c", (
+        "import sys, tkinter as tk\n"
+        "try:\n"
+        "    root = tk.Tk()\n"
+        "except tk.TclError:\n"
+        f"    sys.exit({SKIP_EXIT_CODE})\n"
+        "from gui import DataGeneratorApp\n"
+        "DataGeneratorApp(root)\n"
+        "root.update()\n"
+        "root.destroy()\n"
+    )],
+}
+STARTUP_REPEATS = 5
+
+SUITES = ("dispatch", "columns", "fields", "export", "startup")
+DEFAULT_EXPORT_SIZES = (10000, 100000, 1000000)
+DEFAULT_EXPORT_FORMATS = ("JSON", "CSV")
+EXPORT_MODES = ("serial", "parallel")
+
+def _dispatch_value(field_type):
+    """
+    Per-value dispatch as generate_field_value used to do it: a fresh
+    type -> generator dict is built for every single value.
+    """
+    generators = {name: (lambda name=name: FIELD_GENERATORS[name]()) for name in FIELD_GENERATORS}
+    return generators[field_type]()
+
+def bench_dispatch(fields, rows):
+    """Generate rows with per-cell field lookups and dispatch"""
+    start = time.perf_counter()
+    for _ in range(rows):
+        record = {}
+        for field in fields:
+            record[field["name"]] = _dispatch_value(field["type"])
+    return time.perf_counter() - start
+
+def bench_compiled(fields, rows):
+    """Generate rows through a compiled schema"""
+    start = time.perf_counter()
+    compile_schema(fields).build_rows(rows)
+    return time.perf_counter() - start
+
+def bench_column(field_type, rows, vectorize):
+    """Generate one column of a single field type"""
+    context = GeneratorContext(seed=0, vectorize=vectorize)
+    schema = compile_schema([{"name": field_type, "type": field_type}], context)
+    start = time.perf_counter()
+    schema.build_columns(rows)
+    return time.perf_counter() - start
+
+def bench_export(fields, rows, export_format, mode):
+    """
+    Generate and export `rows` records to a temporary file.
+
+    Meant to run in a fresh process (see `run_isolated`).
+
+    Returns:
+        dict: Seconds taken, output size in bytes and peak RSS in MiB
+    """
+    fd, path = tempfile.mkstemp(suffix=EXPORT_FORMATS[export_format])
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        if mode == "parallel":
+            chunks = iter_parallel_chunks(fields, rows, seed=0)
+        else:
+            chunks = iter_record_chunks(fields, rows, context=GeneratorContext(seed=0))
+        export_records(chunks, path, export_format, fields)
+        seconds = time.perf_counter() - start
+        size = os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+    return {"seconds": seconds, "bytes": size, "peak_rss_mb": peak_rss_mb()}
+
+def bench_startup(args, repeats=STARTUP_REPEATS):
+    """
+    Time a command in fresh interpreters, from process start to exit.
+
+    Returns:
+        float: Fastest of `repeats` runs in seconds, or None if the command
+            was skipped (exited with SKIP_EXIT_CODE)
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        code = subprocess.run([sys.executable] + args, cwd=here, stdout=subprocess.DEVNULL).returncode
+        seconds = time.perf_counter() - start
+        if code == SKIP_EXIT_CODE:
+            return None
+        if code != 0:
+            raise RuntimeError(f"Startup benchmark failed: {' '.join(args)}")
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+def run_isolated(func, *args):
+    """Run a benchmark function in a freshly spawned process"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(func, *args).result()
+
+def _result(suite, name, rows, seconds, **extra):
+    """Build one machine-readable result entry"""
+    result = {
+        "suite": suite,
+        "name": name,
+        "rows": rows,
+        "seconds": round(seconds, 6),
+        "rows_per_sec": round(rows / seconds, 1) if seconds > 0 else None,
+    }
+    result.update(extra)
+    return result
+
+def run_dispatch(rows):
+    """Compiled schema vs. per-value dispatch"""
+    results = []
+    for schema_name, fields in SCHEMAS.items():
+        dispatch = bench_dispatch(fields, rows)
+        compiled = bench_compiled(fields, rows)
+        results.append(_result("dispatch", f"{schema_name}/per-value dispatch", rows, dispatch))
+        results.append(_result("dispatch", f"{schema_name}/compiled schema", rows, compiled))
+    return results
+
+def run_columns(rows):
+    """Vectorized vs. scalar columns for the types NumPy can generate"""
+    results = []
+    for field_type in GeneratorContext(vectorize=True).column_generators:
+        scalar = bench_column(field_type, rows, vectorize=False)
+        vector = bench_column(field_type, rows, vectorize=True)
+        results.append(_result("columns", f"{field_type}/scalar", rows, scalar))
+        results.append(_result("columns", f"{field_type}/numpy", rows, vector))
+    return results
+
+def run_fields(rows):
+    """Rows/sec for every supported field type, as generation uses them"""
+    return [
+        _result("fields", field_type, rows, bench_column(field_type, rows, vectorize=True))
+        for field_type in FIELD_TYPES
+    ]
+
+def run_export(sizes, formats):
+    """End-to-end generate + export throughput and peak RSS"""
+    results = []
+    for export_format in formats:
+        for mode in EXPORT_MODES:
+            for rows in sizes:
+                measured = run_isolated(bench_export, EXPORT_FIELDS, rows, export_format, mode)
+                seconds = measured.pop("seconds")
+                results.append(_result("export", f"{export_format}/{mode}/{rows}", rows, seconds, **measured))
+    return results
+
+def run_startup():
+    """Cold start times; rows/sec here is starts per second"""
+    results = []
+    for name, args in STARTUP_CASES.items():
+        seconds = bench_startup(args)
+        if seconds is None:
+            print(f"skipping startup/{name}: no display", file=sys.stderr)
+            continue
+        results.append(_result("startup", name, 1, seconds, ms=round(seconds * 1000, 1)))
+    return results
+
+def environment():
+    """Describe the machine and optional libraries, for comparing result files"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": GeneratorContext(vectorize=True).vectorize,
+        "json_backend": JSONSerializer().backend,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def print_results(results):
+    """Print results as a table"""
+    suite = None
+    for result in results:
+        if result["suite"] != suite:
+            suite = result["suite"]
+            print(f"[{suite}]")
+        if "ms" in result:
+            print(f"  {result['name']:<36} {result['ms']:>14,.1f} ms")
+            continue
+        line = f"  {result['name']:<36} {result['rows_per_sec'] or 0:>14,.0f} rows/sec"
+        if result.get("peak_rss_mb") is not None:
+            line += f"  {result['peak_rss_mb']:>8,.1f} MiB peak"
+        print(line)
+
+def compare_results(results, baseline, threshold):
+    """
+    Print the change against a baseline and count regressions.
+
+    Args:
+        results (list): Results of this run
+        baseline (list): Results of an earlier run
+        threshold (float): Allowed slowdown, e.g. 0.1 for 10%
+
+    Returns:
+        int: Number of benchmarks slower than the threshold allows
+    """
+    previous = {(result["suite"], result["name"]): result for result in baseline}
+    regressions = 0
+
+    print(f"[compare, threshold {threshold:.0%}]")
+    for result in results:
+        before = previous.get((result["suite"], result["name"]))
+        if not before or not before.get("rows_per_sec") or not result["rows_per_sec"]:
+            continue
+
+        change = result["rows_per_sec"] / before["rows_per_sec"] - 1
+        flag = ""
+        if change < -threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"  {result['suite'] + '/' + result['name']:<44} {change:>+8.1%}{flag}")
+
+    return regressions
+
+def main(argv=None):
+    """
+    Run the benchmarks.
+
+    Returns:
+        int: Exit code; 1 if a regression was found when comparing
+    """
+    parser = argparse.ArgumentParser(description="Benchmark data generation and export")
+    parser.add_argument("--suite", action="append", choices=SUITES,
+                        help="suite to run (repeatable, default: all)")
+    parser.add_argument("--rows", type=int, default=5000,
+                        help="rows per generation benchmark (columns use 10x)")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_EXPORT_SIZES),
+                        help="comma separated row counts for the export suite")
+    parser.add_argument("--formats", default=",".join(DEFAULT_EXPORT_FORMATS),
+                        help="comma separated export formats for the export suite")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="slowdown that counts as a regression (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    suites = args.suite or SUITES
+    sizes = [int(size) for size in args.sizes.split(",")]
+    formats = [name.strip() for name in args.formats.split(",")]
+
+    results = []
+    if "dispatch" in suites:
+        results += run_dispatch(args.rows)
+    if "columns" in suites:
+        results += run_columns(args.rows * 10)
+    if "fields" in suites:
+        results += run_fields(args.rows)
+    if "export" in suites:
+        results += run_export(sizes, formats)
+    if "startup" in suites:
+        results += run_startup()
+
+    print_results(results)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        if compare_results(results, baseline, args.threshold):
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Resumable, checkpointed exports.
+
+A long export that is killed or cancelled halfway can be picked up again
+instead of starting over. While a file is written, a small JSON manifest
+next to it (`<output>.checkpoint.json`) records:
+
+* the run's seed, so a run without an explicit seed can be repeated
+* a hash of the settings that shape the output (fields, count, chunk size,
+  format, locale and writer options)
+* the number of chunks and rows completed
+* the file offset at the end of the last completed chunk
+
+The manifest is replaced atomically after every chunk. Running the same
+export again with the manifest present truncates the file to the recorded
+offset, skips the completed chunks and appends the rest. Chunks are seeded
+from the seed and their index, so the resumed file is byte-for-byte the
+file an uninterrupted run would have written. Once the export finishes the
+manifest is deleted.
+
+Only uncompressed files in formats whose writers are `appendable` (JSON,
+JSON Lines and CSV) can be resumed; Parquet and Arrow files are only valid
+once their footer is written. The file is flushed, not fsynced, before each manifest update, so
+checkpoints survive the process dying but not the machine losing power.
+"""
+
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+
+import vectorized
+from compression import compression_for_path
+from data_generator import DEFAULT_CHUNK_SIZE, Progress
+from exporters import WRITE_BUFFER_SIZE, open_writer, writer_class
+from parallel import iter_parallel_chunks
+
+MANIFEST_SUFFIX = ".checkpoint.json"
+
+# Bumped when the manifest layout changes; older manifests are ignored
+MANIFEST_VERSION = 1
+
+def checkpoint_path(output_file):
+    """Default manifest path for an output file"""
+    return output_file + MANIFEST_SUFFIX
+
+def settings_hash(fields, count, chunk_size, export_format, locale=None, **options):
+    """
+    Hash the settings that determine an export's output, apart from the seed.
+
+    Args:
+        fields (list): Field definitions
+        count (int): Number of records
+        chunk_size (int): Records per chunk
+        export_format (str): One of the keys in exporters.EXPORT_FORMATS
+        locale (str): Faker locale
+        **options: Writer options
+
+    Returns:
+        str: Hex digest
+    """
+    settings = {
+        "fields": fields,
+        "count": count,
+        "chunk_size": chunk_size,
+        "format": export_format,
+        "locale": locale,
+        # Vectorized columns draw different values than Faker
+        "numpy": vectorized.HAVE_NUMPY,
+        "options": options,
+    }
+    # Objects such as serializers only count by type
+    data = json.dumps(settings, sort_keys=True, default=lambda value: type(value).__name__)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+def read_manifest(path):
+    """
+    Read a checkpoint manifest.
+
+    Returns:
+        dict: The manifest, or None if it is missing, unreadable or from
+            another version
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+def write_manifest(path, manifest):
+    """Write a manifest atomically, so a crash leaves the old or the new one"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".checkpoint-", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+def export_resumable(fields, count, output_file, export_format, seed=None, workers=None,
+                     chunk_size=DEFAULT_CHUNK_SIZE, locale=None, checkpoint=None,
+                     progress=None, cancel=None, profile=None, **options):
+    """
+    Generate records into a file, checkpointing after every chunk.
+
+    If a manifest from an interrupted run with the same settings exists,
+    the run continues from its last completed chunk. A manifest that doesn't
+    match (different settings, a different explicit seed, or a file shorter
+    than the recorded offset) is ignored and the export starts over.
+
+    Unlike `exporters.export_records`, a cancelled run keeps its file and
+    manifest so it can be resumed.
+
+    Args:
+        fields (list): Field definitions
+        count (int): Number of records to generate
+        output_file (str): Path of the file to write
+        export_format (str): "JSON", "JSON Lines" or "CSV"
+        seed (int): Master seed; taken from the manifest when resuming, or
+            chosen at random for a new run if omitted
+        workers (int): Number of worker processes, see
+            `parallel.iter_parallel_chunks`
+        chunk_size (int): Records per chunk and checkpoint
+        locale (str): Faker locale
+        checkpoint (str): Manifest path, defaults to
+            `<output_file>.checkpoint.json`
+        progress (callable): Called with a data_generator.Progress after
+            every chunk; rows from the interrupted run count as done
+        cancel (CancellationToken): Token to stop the export early
+        profile (profiling.GenerationProfile): Profile to record timings into
+        **options: Format specific writer options
+
+    Returns:
+        int: Number of records in the finished file
+    """
+    if not writer_class(export_format).appendable:
+        raise ValueError(f"{export_format} exports can't be resumed")
+    if compression_for_path(output_file) is not None:
+        raise ValueError("Compressed exports can't be resumed")
+
+    checkpoint = checkpoint or checkpoint_path(output_file)
+    digest = settings_hash(fields, count, chunk_size, export_format, locale, **options)
+
+    manifest = read_manifest(checkpoint)
+    if not _can_resume(manifest, digest, seed, output_file):
+        manifest = None
+
+    if manifest is None:
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "settings": digest,
+            "seed": seed,
+            "chunks_done": 0,
+            "rows_done": 0,
+            "offset": 0,
+        }
+        write_manifest(checkpoint, manifest)
+        f = open(output_file, 'wb', buffering=WRITE_BUFFER_SIZE)
+    else:
+        seed = manifest["seed"]
+        f = open(output_file, 'r+b', buffering=WRITE_BUFFER_SIZE)
+        f.truncate(manifest["offset"])
+        f.seek(manifest["offset"])
+
+    rows_done = manifest["rows_done"]
+    chunks = iter_parallel_chunks(
+        fields, count, seed, workers, chunk_size, locale,
+        progress=_offset_progress(progress, rows_done, count), cancel=cancel,
+        profile=profile, start_shard=manifest["chunks_done"],
+    )
+
+    # A cancelled or failed run leaves the file and manifest for the next run
+    with f:
+        writer = open_writer(f, export_format, fields, **options)
+        writer.resume(rows_done)
+        for chunk in chunks:
+            start = time.perf_counter()
+            writer.write_chunk(chunk)
+            f.flush()
+            if profile is not None:
+                profile.add_phase("export", time.perf_counter() - start, len(chunk))
+
+            manifest["chunks_done"] += 1
+            manifest["rows_done"] = writer.records_written
+            manifest["offset"] = f.tell()
+            write_manifest(checkpoint, manifest)
+        writer.close()
+
+    os.remove(checkpoint)
+    return writer.records_written
+
+def _can_resume(manifest, digest, seed, output_file):
+    """Check that a manifest belongs to this export and its file is intact"""
+    if manifest is None or manifest.get("settings") != digest:
+        return False
+    if seed is not None and manifest.get("seed") != seed:
+        return False
+    try:
+        return os.path.getsize(output_file) >= manifest["offset"]
+    except OSError:
+        return False
+
+def _offset_progress(progress, rows_done, total):
+    """Wrap a progress callback so rows from an earlier run count as done"""
+    if progress is None or not rows_done:
+        return progress
+
+    def report(update):
+        progress(Progress(rows_done + update.rows_done, total, update.elapsed))
+
+    return report
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Headless command line interface for the User Data Generator.
+
+Generates records without starting (or even importing) Tk, streaming them
+to a file or to stdout so they can be piped straight into other tools:
+
+    python main.py --headless --field "id:UUID" --field "email:Email" \\
+        --count 1000000 --format csv --seed 42 -o - | psql -c "COPY users FROM STDIN CSV HEADER"
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+from checkpoint import export_resumable
+from compression import COMPRESSIONS, strip_compression_suffix
+from data_generator import DEFAULT_CHUNK_SIZE, FIELD_TYPES, load_schema, read_schema_file
+from databases import (
+    DEFAULT_BATCH_SIZE, DEFAULT_COMMIT_INTERVAL, DEFAULT_TABLE, IF_EXISTS_OPTIONS,
+    database_format, export_to_database, is_database_target,
+)
+from exporters import DATABASE_FORMATS, EXPORT_FORMATS, WRITE_BUFFER_SIZE, output_compression, writer_class
+from parallel import iter_parallel_chunks
+from pipeline import PipelineStats, write_pipelined
+from profiling import GenerationProfile
+from relational import export_relational, is_relational_schema
+
+# Short, shell-friendly names for the export formats
+FORMAT_ALIASES = {
+    "json": "JSON",
+    "json-compact": "JSON (compact)",
+    "jsonl": "JSON Lines",
+    "ndjson": "JSON Lines",
+    "csv": "CSV",
+    "parquet": "Parquet",
+    "arrow": "Arrow IPC",
+    "sqlite": "SQLite",
+    "postgres": "PostgreSQL",
+    "postgresql": "PostgreSQL",
+}
+
+# Formats taking --row-group-size and --parquet-compression
+COLUMNAR_FORMATS = ("Parquet", "Arrow IPC")
+
+# Compression codecs inside columnar files, per format
+COLUMNAR_COMPRESSIONS = {
+    "Parquet": ("snappy", "gzip", "brotli", "zstd", "lz4", "none"),
+    "Arrow IPC": ("lz4", "zstd", "none"),
+}
+
+def parse_field(spec):
+    """
+    Parse a `--field name:type[:param=value,...]` argument.
+
+    Args:
+        spec (str): Field specification, e.g. "full_name:Full Name" or
+            "age:Number:min=18,max=65"
+
+    Returns:
+        dict: The field definition
+    """
+    name, sep, rest = spec.partition(":")
+    field_type, _, param_spec = rest.partition(":")
+    if not sep or not name.strip() or not field_type.strip():
+        raise argparse.ArgumentTypeError(f"expected name:type, got '{spec}'")
+
+    field = {"name": name.strip(), "type": field_type.strip()}
+    if param_spec.strip():
+        params = {}
+        for item in param_spec.split(","):
+            key, _, value = item.partition("=")
+            try:
+                params[key.strip()] = int(value)
+            except ValueError:
+                raise argparse.ArgumentTypeError(f"expected param=number, got '{item}'")
+        field["params"] = params
+    return field
+
+def resolve_format(export_format, output):
+    """
+    Work out the export format from the --format option or output extension.
+
+    Args:
+        export_format (str): Value of --format, or None
+        output (str): Output path, database URL, or "-" for stdout
+
+    Returns:
+        str: One of the keys in EXPORT_FORMATS, or "PostgreSQL"
+    """
+    if export_format is None:
+        if is_database_target(output):
+            return database_format(output)
+
+        ext = os.path.splitext(strip_compression_suffix(output))[1].lower()
+        for name, format_ext in EXPORT_FORMATS.items():
+            if ext == format_ext:
+                return name
+        # Line-oriented output is the most useful default for pipes
+        return "JSON Lines"
+
+    return FORMAT_ALIASES.get(export_format.lower(), export_format)
+
+def build_parser():
+    """Create the argument parser"""
+    parser = argparse.ArgumentParser(
+        prog="main.py --headless",
+        description="Generate dummy user data without the GUI.",
+    )
+    parser.add_argument("--schema", help="JSON or YAML file with the field definitions, or with "
+                                         "several related tables")
+    parser.add_argument("--field", action="append", type=parse_field, default=[],
+                        metavar="NAME:TYPE[:PARAMS]",
+                        help="add a field (repeatable), e.g. age:Number:min=18,max=65")
+    parser.add_argument("--count", type=int, help="number of records to generate")
+    parser.add_argument("--format", dest="export_format",
+                        help="json, json-compact, jsonl, csv, parquet, arrow, sqlite or postgres "
+                             "(default: from the output, else jsonl)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output file, database URL (sqlite:///file.db, postgresql://...) "
+                             "or - for stdout (default)")
+    parser.add_argument("--compress", choices=list(COMPRESSIONS),
+                        help="compress json, jsonl and csv output (default: from the output "
+                             "extension, .gz or .zst)")
+    parser.add_argument("--compress-level", type=int, help="compression level")
+    parser.add_argument("--row-group-size", type=int,
+                        help="rows per Parquet row group or Arrow record batch (default: 100000)")
+    parser.add_argument("--parquet-compression", choices=COLUMNAR_COMPRESSIONS["Parquet"],
+                        help="codec inside parquet files (default: snappy), or arrow files "
+                             "(lz4 or zstd; default: none)")
+    parser.add_argument("--seed", type=int, help="seed for reproducible output")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--locale", help="Faker locale, e.g. de_DE, or a weighted mix such as "
+                                         "de_DE:2,ja_JP,pt_BR")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"records per chunk (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--table", default=DEFAULT_TABLE,
+                        help=f"table to load into for database output (default: {DEFAULT_TABLE})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"rows per insert/COPY batch for database output (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--commit-interval", type=int, default=DEFAULT_COMMIT_INTERVAL,
+                        help=f"rows per transaction for database output (default: {DEFAULT_COMMIT_INTERVAL})")
+    parser.add_argument("--if-exists", choices=IF_EXISTS_OPTIONS, default="replace",
+                        help="what to do if the database table exists (default: replace)")
+    parser.add_argument("--resume", action="store_true",
+                        help="checkpoint after every chunk and continue an interrupted run "
+                             "of the same export (json, jsonl and csv files only)")
+    parser.add_argument("--profile", action="store_true",
+                        help="print per-field and per-provider timings to stderr when done")
+    parser.add_argument("--stats", action="store_true",
+                        help="print the throughput of each export stage to stderr when done")
+    parser.add_argument("--list-types", action="store_true", help="list the supported field types and exit")
+    return parser
+
+def main(argv=None):
+    """
+    Run the headless generator.
+
+    Args:
+        argv (list): Command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: Exit code (0 for success, non-zero for errors)
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.list_types:
+        print("\n".join(FIELD_TYPES))
+        return 0
+
+    fields = []
+    try:
+        if args.schema:
+            if is_relational_schema(read_schema_file(args.schema)):
+                return _run_relational(parser, args)
+            fields.extend(load_schema(args.schema))
+    except (OSError, ValueError) as e:
+        parser.error(f"could not read schema: {e}")
+    fields.extend(args.field)
+
+    if not fields:
+        parser.error("no fields given, use --schema or --field")
+    if args.count is None:
+        parser.error("--count is required")
+
+    export_format = resolve_format(args.export_format, args.output)
+    options = writer_options(parser, args, export_format)
+    profile = GenerationProfile() if args.profile else None
+    stats = PipelineStats() if args.stats else None
+
+    if args.resume and (args.output == "-" or export_format in DATABASE_FORMATS):
+        parser.error("--resume needs an output file, use -o")
+    if args.resume and args.compress:
+        parser.error("--resume can't be combined with --compress")
+
+    try:
+        if args.resume:
+            export_resumable(
+                fields, args.count, args.output, export_format, seed=args.seed,
+                workers=args.workers, chunk_size=args.chunk_size, locale=args.locale,
+                profile=profile,
+            )
+            if profile is not None:
+                print_profile(profile.report())
+            return 0
+
+        writer_class(export_format)  # Fail on unknown formats before creating the file
+        chunks = iter_parallel_chunks(
+            fields, args.count, seed=args.seed, workers=args.workers,
+            shard_size=args.chunk_size, locale=args.locale, profile=profile,
+        )
+        if export_format in DATABASE_FORMATS:
+            if args.output == "-":
+                parser.error(f"{export_format} output needs a database file or URL, use -o")
+            export_to_database(
+                chunks, args.output, fields, export_format, table=args.table, profile=profile,
+                batch_size=args.batch_size, commit_interval=args.commit_interval,
+                if_exists=args.if_exists,
+            )
+        else:
+            _write(chunks, fields, export_format, args.output, profile, stats,
+                   args.compress, args.compress_level, **options)
+
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); that's not an error for us
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+
+    except (ValueError, RuntimeError, OSError, sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    if profile is not None:
+        print_profile(profile.report())
+    if stats is not None:
+        print_stats(stats.report())
+
+    return 0
+
+def _run_relational(parser, args):
+    """Generate a multi-table schema, one output file or database table per table"""
+    spec = read_schema_file(args.schema)
+    if args.output == "-":
+        parser.error("multi-table schemas need -o with an output directory or database")
+    if args.field:
+        parser.error("--field can't be combined with a multi-table schema")
+    if args.compress or args.workers is not None or args.resume:
+        parser.error("--compress, --workers and --resume can't be combined with a multi-table schema")
+
+    export_format = resolve_format(args.export_format, args.output)
+    options = writer_options(parser, args, export_format)
+    if export_format in DATABASE_FORMATS:
+        options = {
+            "batch_size": args.batch_size,
+            "commit_interval": args.commit_interval,
+            "if_exists": args.if_exists,
+        }
+
+    try:
+        counts = export_relational(
+            spec, args.output, export_format, seed=args.seed, locale=args.locale,
+            chunk_size=args.chunk_size, count=args.count, **options
+        )
+    except (ValueError, RuntimeError, OSError, sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    for table, count in counts.items():
+        print(f"{table}: {count:,} records", file=sys.stderr)
+    return 0
+
+def writer_options(parser, args, export_format):
+    """
+    Collect the columnar writer options given on the command line.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser to report errors with
+        args (argparse.Namespace): Parsed arguments
+        export_format (str): The resolved export format
+
+    Returns:
+        dict: `row_group_size` and `compression` options for the writer,
+            if given
+    """
+    options = {}
+    if args.row_group_size is None and args.parquet_compression is None:
+        return options
+    if export_format not in COLUMNAR_FORMATS:
+        parser.error("--row-group-size and --parquet-compression only apply to parquet and arrow output")
+
+    if args.row_group_size is not None:
+        if args.row_group_size <= 0:
+            parser.error("--row-group-size must be a positive number")
+        options["row_group_size"] = args.row_group_size
+    if args.parquet_compression is not None:
+        if args.parquet_compression not in COLUMNAR_COMPRESSIONS[export_format]:
+            codecs = ", ".join(COLUMNAR_COMPRESSIONS[export_format])
+            parser.error(f"{export_format} output supports --parquet-compression {codecs}")
+        options["compression"] = None if args.parquet_compression == "none" else args.parquet_compression
+    return options
+
+def print_profile(report, file=None):
+    """Print a profile report as tables (to stderr by default)"""
+    file = file or sys.stderr
+    phases = report["phases"]
+    print(f"profile: {report['rows']:,} rows, generation {phases['generation']:.3f}s, "
+          f"export {phases['export']:.3f}s", file=file)
+    print("fields:", file=file)
+    for entry in report["fields"]:
+        print(f"  {entry['name']:<24} {entry['type']:<16} {entry['seconds']:>10.3f}s "
+              f"{entry['share']:>7.1%}", file=file)
+    if report["providers"]:
+        print("faker providers:", file=file)
+        for entry in report["providers"]:
+            print(f"  {entry['provider']:<41} {entry['seconds']:>10.3f}s {entry['calls']:>10,} calls",
+                  file=file)
+
+def print_stats(report, file=None):
+    """Print the per-stage throughput of a pipelined export (to stderr by default)"""
+    file = file or sys.stderr
+    print(f"stages: {report['elapsed']:.3f}s elapsed", file=file)
+    for entry in report["stages"]:
+        print(f"  {entry['stage']:<10} {entry['seconds']:>9.3f}s busy {entry['waited']:>9.3f}s blocked "
+              f"{entry['rows_per_second']:>12,.0f} rows/s {entry['bytes_per_second'] / 1e6:>9,.1f} MB/s",
+              file=file)
+
+def _write(chunks, fields, export_format, output, profile=None, stats=None, compress=None,
+           compress_level=None, **options):
+    """Stream chunks into the output file or stdout"""
+    compress = output_compression(export_format, None if output == "-" else output, compress)
+    if output == "-":
+        stream = sys.stdout.buffer
+    else:
+        stream = open(output, 'wb', buffering=WRITE_BUFFER_SIZE)
+
+    try:
+        # Encoded chunks are written (and flushed when piping) by a
+        # background thread while the next chunk is generated
+        write_pipelined(
+            chunks, stream, export_format, fields, profile=profile, stats=stats,
+            compress=compress, compress_level=compress_level, **options
+        )
+    finally:
+        if output != "-":
+            stream.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
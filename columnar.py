@@ -0,0 +1,153 @@
+"""
+Columnar exporters: Parquet and Arrow IPC.
+
+Records arrive in chunks from the generator and are turned into Arrow
+record batches column by column, using an Arrow schema derived from the
+field list: "Number" becomes int64, "Boolean" bool, "Date of Birth"
+date32, "Credit Card" a struct of its three parts, and everything else a
+string. Batches are buffered up to the configured row-group size, so
+output files have large row groups even when generation chunks are small.
+
+Requires pyarrow, which is imported only when one of these writers is
+used.
+"""
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+
+from exporters import RecordWriter
+
+# Rows per Parquet row group / Arrow record batch
+DEFAULT_ROW_GROUP_SIZE = 100000
+
+CREDIT_CARD_TYPE = pa.struct([
+    ("number", pa.string()),
+    ("expiry", pa.string()),
+    ("provider", pa.string()),
+])
+
+# Arrow types for field types that aren't plain strings
+ARROW_TYPES = {
+    "Number": pa.int64(),
+    "Boolean": pa.bool_(),
+    "Date of Birth": pa.date32(),
+    "Credit Card": CREDIT_CARD_TYPE,
+}
+
+def arrow_schema(fields):
+    """
+    Build the Arrow schema for a field list.
+
+    Args:
+        fields (list): List of dictionaries with 'name' and 'type' keys
+
+    Returns:
+        pyarrow.Schema: One column per field, in field order
+    """
+    return pa.schema([
+        (field["name"], ARROW_TYPES.get(field["type"], pa.string()))
+        for field in fields
+    ])
+
+class ArrowBatchWriter(RecordWriter):
+    """
+    Base for writers that consume Arrow record batches.
+
+    Subclasses open their Arrow writer in `_open` and write a full batch in
+    `_write_batch`.
+    """
+
+    # The file footer is only written on close
+    appendable = False
+
+    # Parquet and Arrow compress internally, see the `compression` option
+    compressible = False
+
+    def __init__(self, stream, fields, row_group_size=DEFAULT_ROW_GROUP_SIZE, compression=None):
+        if not fields:
+            raise ValueError("Columnar export needs the field list")
+        if row_group_size <= 0:
+            raise ValueError("Row group size must be a positive number")
+
+        super().__init__(stream, fields)
+        self.schema = arrow_schema(fields)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self._writer = None
+        self._pending = []
+        self._pending_rows = 0
+
+    def write_chunk(self, records):
+        if not records:
+            return
+
+        self._pending.append(self._to_batch(records))
+        self._pending_rows += len(records)
+        self.records_written += len(records)
+
+        while self._pending_rows >= self.row_group_size:
+            self._flush(self.row_group_size)
+
+    def close(self):
+        if self._pending_rows:
+            self._flush(self._pending_rows)
+        if self._writer is None:
+            # Still produce a valid, empty file
+            self._writer = self._open()
+        self._writer.close()
+
+    def _to_batch(self, records):
+        """Transpose a chunk of records into an Arrow record batch"""
+        arrays = []
+        for field in self.schema:
+            values = [record[field.name] for record in records]
+            if field.type == pa.date32():
+                arrays.append(pa.array(values, type=pa.string()).cast(pa.date32()))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    def _flush(self, rows):
+        """Write the first `rows` buffered rows as one row group"""
+        table = pa.Table.from_batches(self._pending, schema=self.schema)
+        head = table.slice(0, rows)
+        tail = table.slice(rows)
+
+        if self._writer is None:
+            self._writer = self._open()
+        self._write_batch(head.combine_chunks().to_batches()[0])
+
+        self._pending = tail.to_batches()
+        self._pending_rows = tail.num_rows
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _write_batch(self, batch):
+        raise NotImplementedError
+
+class ParquetWriter(ArrowBatchWriter):
+    """Write records to a Parquet file, one row group per `row_group_size` rows"""
+
+    def __init__(self, stream, fields, row_group_size=DEFAULT_ROW_GROUP_SIZE, compression="snappy"):
+        super().__init__(stream, fields, row_group_size, compression)
+
+    def _open(self):
+        return pq.ParquetWriter(self.stream, self.schema, compression=self.compression or "none")
+
+    def _write_batch(self, batch):
+        self._writer.write_batch(batch, row_group_size=self.row_group_size)
+
+class ArrowIPCWriter(ArrowBatchWriter):
+    """
+    Write records to an Arrow IPC (Feather v2) file, one record batch per
+    `row_group_size` rows. Compression may be "lz4", "zstd" or None.
+    """
+
+    def _open(self):
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        return pa.ipc.new_file(self.stream, self.schema, options=options)
+
+    def _write_batch(self, batch):
+        self._writer.write_batch(batch)
@@ -1,84 +1,686 @@
 import random
-from faker import Faker
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
 import uuid
+from collections.abc import Mapping
 from datetime import datetime, timedelta
 import string
 
-# Initialize the Faker generator
-# We'll use a single instance for better performance
-fake = Faker()
+import locales
+import pools
+import uniqueness
+import vectorized
 
-def generate_data(fields, count):
+# Number of records generated per batch by the streaming API
+DEFAULT_CHUNK_SIZE = 10000
+
+# Parameters a field can set under "params", with their defaults
+FIELD_PARAMETERS = {
+    "Number": {"min": 1, "max": 1000},
+    "Text": {"sentences": 2},
+    "Date of Birth": {"min_age": 18, "max_age": 90},
+}
+
+# Number bounds must fit in a signed 64-bit integer, the widest integer
+# column of the SQLite, PostgreSQL and Arrow outputs
+NUMBER_MIN = -2 ** 63
+NUMBER_MAX = 2 ** 63 - 1
+
+# Field type -> Faker provider modules its generator uses, in display
+# order. Providers are only loaded for the types a schema generates.
+FIELD_PROVIDERS = {
+    "Full Name": ("person",),
+    "First Name": ("person",),
+    "Last Name": ("person",),
+    "Email": ("internet", "company", "person", "date_time"),
+    "Phone Number": ("phone_number",),
+    "Address": ("address", "person", "misc"),
+    "City": ("address", "person"),
+    "Country": ("address",),
+    "Postal Code": ("address",),
+    "Date of Birth": ("date_time",),
+    "Username": ("internet", "person", "date_time"),
+    "Password": ("misc",),
+    "Text": ("lorem",),
+    "Number": (),
+    "Boolean": (),
+    "UUID": (),
+    "Job Title": ("job",),
+    "Company": ("company", "person"),
+    "Credit Card": ("credit_card", "date_time"),
+    "URL": ("internet", "company", "person", "date_time"),
+}
+
+# Supported field types, in display order
+FIELD_TYPES = tuple(FIELD_PROVIDERS)
+
+class GeneratorContext:
+    """
+    Owns the random state used to generate data.
+    
+    Each context has its own Faker instance (leased from the per-process
+    cache in locales.py) and random.Random, so contexts can run
+    concurrently without sharing state. A seeded context reproduces
+    the same records on every run, so datasets can be recreated from their
+    seed instead of being stored.
+    
+    Seeded runs reseed the context at the start of every chunk from the
+    seed and chunk index, which keeps the output the same whether chunks
+    are generated serially or spread over worker processes. Within a chunk,
+    every column is reseeded from the chunk seed and its field name, so a
+    column's values don't depend on the other fields, and the first rows
+    of a column are the same however many rows are generated.
+    
+    With `vectorize` on and NumPy installed, the types in
+    `vectorized.column_generators` are produced a column at a time from the
+    context's NumPy generator. Seeded output therefore depends on whether
+    NumPy is available; pass `vectorize=False` for output that doesn't.
+    
+    Faker is imported and instantiated on first use, and only the provider
+    modules of the field types actually generated are loaded (see
+    FIELD_PROVIDERS), so contexts are cheap to create and a schema of
+    numbers and UUIDs never loads Faker at all.
+    
+    `locale` can also weight several locales (see locales.py), e.g.
+    "de_DE:2,ja_JP". Every row of a chunk is then given one of them, drawn
+    by weight from the chunk seed, and its Faker fields are generated by a
+    child context of that locale (see `locale_context`), so a row's name,
+    address and phone number belong together. Fields can override the
+    locale, or weight their own, with a "locale" key.
+    """
+    
+    def __init__(self, seed=None, locale=None, vectorize=True):
+        self.seed = seed
+        self.locale = locale
+        self.locale_weights = locales.parse_locales(locale)
+        self.vectorize = vectorize and vectorized.HAVE_NUMPY
+        self._fake = None
+        self._providers = None
+        self._release_fake = None
+        self._fake_seed = seed
+        self._locale_contexts = {}
+        self._row_locales = None
+        self._row_locale_random = None
+        self._column_seed = seed
+        self.random = random.Random()
+        self._numpy_random = None
+        self._generators = None
+        self._column_generators = None
+        self._pools = {}
+        self._chunk_seed = seed
+        self.reseed(seed)
+    
+    @property
+    def faker_locale(self):
+        """Locale of the context's own Faker instance (the first one of a weighting)"""
+        return self.locale_weights[0][0] if self.locale_weights else None
+    
+    @property
+    def multilocale(self):
+        """True if the context mixes several locales"""
+        return self.locale_weights is not None and len(self.locale_weights) > 1
+    
+    @property
+    def fake(self):
+        """The context's Faker instance, taken from the cache on first use"""
+        if self._fake is None:
+            fake, self._providers, self._release_fake = locales.acquire_faker(self.faker_locale, self)
+            # Cached instances hold their previous owner's random state
+            fake.seed_instance(self._fake_seed)
+            self._fake = fake
+        return self._fake
+    
+    def close(self):
+        """
+        Return the context's Faker instances to the cache straight away.
+        
+        They are otherwise returned when the context is garbage collected.
+        The context must not be used afterwards.
+        """
+        if self._release_fake is not None:
+            self._release_fake()
+        for context in self._locale_contexts.values():
+            context.close()
+    
+    def locale_context(self, locale):
+        """
+        Return the child context generating the values of one locale.
+        
+        Children are created once per locale. A seeded context reseeds its
+        children from every column seed, so their values are as
+        reproducible as its own.
+        """
+        context = self._locale_contexts.get(locale)
+        if context is None:
+            seed = None if self.seed is None else derive_seed(self.seed, f"locale:{locale}")
+            context = GeneratorContext(seed=seed, locale=locale, vectorize=self.vectorize)
+            self._locale_contexts[locale] = context
+            self._seed_locale_context(locale, context)
+        return context
+    
+    def _seed_locale_context(self, locale, context):
+        if self.seed is not None:
+            context.reseed(derive_seed(self._column_seed, f"locale:{locale}"))
+    
+    def row_locales(self, count):
+        """
+        Return the locale of each of the first `count` rows of the current chunk.
+        
+        Locales are drawn by weight, from the chunk seed for seeded
+        contexts, and stay the same for every column of the chunk.
+        """
+        if self._row_locales is None:
+            seed = None if self.seed is None else derive_seed(self._chunk_seed, "locales")
+            self._row_locale_random = random.Random(seed)
+            self._row_locales = []
+        missing = count - len(self._row_locales)
+        if missing > 0:
+            names, weights = zip(*self.locale_weights)
+            self._row_locales += self._row_locale_random.choices(names, weights, k=missing)
+        return self._row_locales[:count]
+    
+    def load_providers(self, field_type):
+        """Make sure the Faker providers a field type uses are loaded"""
+        fake = self.fake
+        missing = [name for name in FIELD_PROVIDERS[field_type] if name not in self._providers]
+        if not missing:
+            return
+        from faker.factory import Factory
+        Factory.create(
+            self.faker_locale, providers=[f"faker.providers.{name}" for name in missing],
+            generator=fake.factories[0],
+        )
+        self._providers.update(missing)
+    
+    @property
+    def generators(self):
+        """Field type -> generator table bound to this context"""
+        if self._generators is None:
+            self._generators = _field_generators(self)
+        return self._generators
+    
+    @property
+    def numpy_random(self):
+        """NumPy generator for vectorized columns (None if not vectorizing), created on first use"""
+        if self._numpy_random is None and self.vectorize:
+            self._numpy_random = vectorized.new_rng(self._numpy_seed)
+        return self._numpy_random
+    
+    @property
+    def column_generators(self):
+        """Field type -> vectorized column function table (empty if not vectorizing)"""
+        if self._column_generators is None:
+            self._column_generators = vectorized.column_generators(self) if self.vectorize else {}
+        return self._column_generators
+    
+    def reseed(self, seed):
+        """Reset the Faker and random state (None reseeds from OS entropy)"""
+        self._fake_seed = seed
+        if self._fake is not None:
+            self._fake.seed_instance(seed)
+        self.random.seed(seed)
+        self._numpy_seed = seed
+        self._numpy_random = None
+    
+    def seed_chunk(self, index):
+        """Reseed for chunk `index` of a run; only draws new row locales for unseeded contexts"""
+        self._row_locales = None
+        if self.seed is not None:
+            self._chunk_seed = derive_seed(self.seed, index)
+            self.reseed(self._chunk_seed)
+    
+    def seed_column(self, name):
+        """Reseed for the column of field `name` in the current chunk; does nothing for unseeded contexts"""
+        if self.seed is not None:
+            self._column_seed = derive_seed(self._chunk_seed, f"column:{name}")
+            self.reseed(self._column_seed)
+            for locale, context in self._locale_contexts.items():
+                self._seed_locale_context(locale, context)
+    
+    def get_pool(self, field_type, size, params=None):
+        """
+        Return the value pool for a field type, building it on first use.
+        
+        Pools are generated by a separate context seeded from this one's
+        seed, so every worker of a seeded run builds the same pool without
+        disturbing the row-level random state. Fields with parameters get a
+        pool of their own.
+        """
+        key = (field_type, size, tuple(sorted(params.items())) if params else None)
+        if key not in self._pools:
+            spec = None
+            pool_seed = None
+            if self.seed is not None:
+                spec = {"type": field_type, "locale": self.locale, "seed": self.seed, "size": size}
+                pool_seed = derive_seed(self.seed, f"pool:{field_type}:{size}")
+                if params:
+                    spec["params"] = params
+                    pool_seed = derive_seed(pool_seed, json.dumps(params, sort_keys=True))
+            
+            builder = GeneratorContext(seed=pool_seed, locale=self.locale, vectorize=False)
+            if params:
+                generate = parameterized_generator(builder, field_type, params)
+            else:
+                generate = builder.generators[field_type]
+            self._pools[key] = pools.load_pool(spec, generate, size)
+        return self._pools[key]
+
+class GenerationCancelled(Exception):
+    """Raised when a run is stopped through its CancellationToken"""
+
+class CancellationToken:
+    """
+    Thread-safe flag asking a running generation to stop.
+    
+    Generation checks the token between chunks and raises
+    GenerationCancelled once it has been cancelled.
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        """Ask the run to stop"""
+        self._event.set()
+    
+    @property
+    def cancelled(self):
+        """True once cancel() has been called"""
+        return self._event.is_set()
+    
+    def raise_if_cancelled(self):
+        """Raise GenerationCancelled if the run has been cancelled"""
+        if self._event.is_set():
+            raise GenerationCancelled("Generation cancelled")
+
+class Progress:
+    """Snapshot of a run's progress, passed to progress callbacks"""
+    
+    __slots__ = ("rows_done", "total", "elapsed")
+    
+    def __init__(self, rows_done, total, elapsed):
+        self.rows_done = rows_done
+        self.total = total
+        self.elapsed = elapsed
+    
+    @property
+    def rows_per_second(self):
+        """Average throughput since the run started"""
+        return self.rows_done / self.elapsed if self.elapsed > 0 else 0.0
+    
+    @property
+    def fraction(self):
+        """Share of the run completed, between 0 and 1 (None if the total is unknown)"""
+        if not self.total:
+            return None
+        return min(self.rows_done / self.total, 1.0)
+    
+    @property
+    def finished(self):
+        """True once every row of a run with a known total is done"""
+        return self.total is not None and self.rows_done >= self.total
+
+def track_progress(chunks, total=None, progress=None, cancel=None):
+    """
+    Wrap a chunk iterator with progress reporting and cancellation.
+    
+    The token is checked before each chunk is produced, and the callback is
+    called with a Progress once the consumer has finished with each chunk
+    (i.e. when it asks for the next one), so exporters report rows actually
+    written.
+    
+    Args:
+        chunks (iterable): Iterable of lists of records
+        total (int): Expected number of records, if known
+        progress (callable): Called with a Progress after every chunk
+        cancel (CancellationToken): Token to check between chunks
+        
+    Returns:
+        iterator: The same chunks
+    """
+    if progress is None and cancel is None:
+        return iter(chunks)
+    return _track_progress(chunks, total, progress, cancel)
+
+def _track_progress(chunks, total, progress, cancel):
+    """Generator backing track_progress"""
+    start = time.perf_counter()
+    rows_done = 0
+    chunks = iter(chunks)
+    while True:
+        # Check before pulling the next chunk, which is when it's generated
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+        rows_done += len(chunk)
+        if progress is not None:
+            progress(Progress(rows_done, total, time.perf_counter() - start))
+
+def generate_data(fields, count, context=None, progress=None, cancel=None, profile=None,
+                  batch=False):
     """
     Generate sample user data based on field definitions.
     
     Args:
         fields (list): List of dictionaries with 'name' and 'type' keys
         count (int): Number of records to generate
+        context (GeneratorContext): Random state to generate with,
+            defaults to the shared unseeded context
+        progress (callable): Called with a Progress after every chunk
+        cancel (CancellationToken): Token to stop the run early
+        profile (profiling.GenerationProfile): Profile to record field,
+            provider and generation timings into
+        batch (bool): Return a batches.RecordBatch, which stores the
+            records column by column in a fraction of the memory
         
     Returns:
-        list: List of dictionaries containing the generated data
+        list: List of dictionaries containing the generated data, or a
+            RecordBatch of them
     """
-    if not fields:
-        raise ValueError("No fields provided for data generation")
+    chunks = iter_record_chunks(
+        fields, count, context=context, progress=progress, cancel=cancel, profile=profile
+    )
+    if batch:
+        from batches import RecordBatch
+        return RecordBatch.from_chunks(chunks, fields)
+    return [record for chunk in chunks for record in chunk]
+
+def iter_records(fields, count, chunk_size=DEFAULT_CHUNK_SIZE, context=None):
+    """
+    Lazily generate records one at a time.
+    
+    Records are produced in batches of `chunk_size` internally, so only one
+    batch is held in memory at any point regardless of `count`.
+    
+    Args:
+        fields (list): List of dictionaries with 'name' and 'type' keys,
+            or a CompiledSchema
+        count (int): Number of records to generate
+        chunk_size (int): Number of records generated per batch
+        context (GeneratorContext): Random state to generate with
+        
+    Returns:
+        iterator: Iterator over record dictionaries
+    """
+    chunks = iter_record_chunks(fields, count, chunk_size, context)
+    return (record for chunk in chunks for record in chunk)
+
+def iter_record_chunks(fields, count, chunk_size=DEFAULT_CHUNK_SIZE, context=None,
+                       progress=None, cancel=None, profile=None, start_chunk=0):
+    """
+    Lazily generate records in batches.
+    
+    The field list is compiled and validated immediately; generation itself
+    only happens as the returned iterator is consumed.
     
+    Args:
+        fields (list): List of dictionaries with 'name' and 'type' keys,
+            or a CompiledSchema
+        count (int): Number of records to generate
+        chunk_size (int): Maximum number of records per batch
+        context (GeneratorContext): Random state to generate with; ignored
+            when `fields` is already compiled
+        progress (callable): Called with a Progress after every chunk
+        cancel (CancellationToken): Token to stop the run early; the
+            iterator then raises GenerationCancelled
+        profile (profiling.GenerationProfile): Profile to record field,
+            provider and generation timings into; per-field timings need
+            an uncompiled field list
+        start_chunk (int): Index of the first chunk to produce, to resume
+            a seeded run; the chunks yielded are the same as in a full run.
+            Schemas with unique fields regenerate the skipped chunks
+            (without yielding them) to rebuild their seen values.
+        
+    Returns:
+        iterator: Iterator over lists of record dictionaries
+    """
     if count <= 0:
         raise ValueError("Record count must be a positive number")
     
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be a positive number")
+    
+    if start_chunk < 0:
+        raise ValueError("Start chunk must not be negative")
+    
+    schema = compile_schema(fields, context, profile)
+    tracker = uniqueness.UniqueTracker.for_fields(schema.fields)
+    if tracker is None:
+        chunks = _generate_chunks(schema, count, chunk_size, profile, start_chunk)
+    else:
+        chunks = map(tracker.apply, _generate_chunks(schema, count, chunk_size, profile))
+        chunks = itertools.islice(chunks, start_chunk, None)
+    return track_progress(chunks, max(count - start_chunk * chunk_size, 0), progress, cancel)
+
+def _generate_chunks(schema, count, chunk_size, profile=None, start_chunk=0):
+    """Generator backing iter_record_chunks"""
     try:
-        # Generate the specified number of records
-        records = []
-        for _ in range(count):
-            record = {}
-            for field in fields:
-                field_name = field["name"]
-                field_type = field["type"]
-                record[field_name] = generate_field_value(field_type)
-            records.append(record)
-        
-        return records
+        remaining = count - start_chunk * chunk_size
+        chunk_index = start_chunk
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            remaining -= size
+            schema.context.seed_chunk(chunk_index)
+            chunk_index += 1
+            if profile is None:
+                yield schema.build_rows(size)
+                continue
+            
+            start = time.perf_counter()
+            rows = schema.build_rows(size)
+            profile.add_phase("generation", time.perf_counter() - start, size)
+            profile.add_rows(size)
+            yield rows
     
     except Exception as e:
         # Catch any unexpected errors during generation
         raise RuntimeError(f"Error generating data: {str(e)}")
 
-def generate_field_value(field_type):
+def _field_generators(context, fake=None):
+    """
+    Build the table mapping field types to zero-argument generator callables.
+    
+    Generators are built the first time their type is looked up, loading
+    that type's Faker providers. Faker methods are bound directly where no
+    post-processing is needed, so producing a value is a single call with
+    no extra lambda frame. `fake` replaces the context's Faker instance,
+    e.g. with a profiling proxy.
+    """
+    return _GeneratorTable(context, fake)
+
+class _GeneratorTable(Mapping):
+    """Lazily built field type -> generator table of a context"""
+    
+    def __init__(self, context, fake=None):
+        self.context = context
+        self.fake = fake
+        self._generators = {}
+    
+    def __getitem__(self, field_type):
+        generate = self._generators.get(field_type)
+        if generate is None:
+            context = self.context
+            if context.multilocale and FIELD_PROVIDERS[field_type]:
+                # Each value comes from a locale drawn by weight
+                generate = _locale_generator(context, context.locale_weights, {
+                    locale: context.locale_context(locale).generators[field_type]
+                    for locale, _ in context.locale_weights
+                })
+            else:
+                build = _GENERATOR_BUILDERS[field_type]
+                generate = build(context, _faker_for(context, field_type, self.fake))
+            self._generators[field_type] = generate
+        return generate
+    
+    def __contains__(self, field_type):
+        return field_type in _GENERATOR_BUILDERS
+    
+    def __iter__(self):
+        return iter(_GENERATOR_BUILDERS)
+    
+    def __len__(self):
+        return len(_GENERATOR_BUILDERS)
+
+def _faker_for(context, field_type, fake=None):
+    """
+    Faker instance for generating a field type, with its providers loaded.
+    
+    Returns None for types that don't use Faker, without creating one.
+    """
+    if not FIELD_PROVIDERS[field_type]:
+        return None
+    context.load_providers(field_type)
+    return fake if fake is not None else context.fake
+
+def _credit_card_generator(fake):
+    """Generator for "Credit Card" values"""
+    return lambda: {
+        "number": fake.credit_card_number(),
+        "expiry": fake.credit_card_expire(),
+        "provider": fake.credit_card_provider()
+    }
+
+# Field type -> function(context, fake) building its default generator
+_GENERATOR_BUILDERS = {
+    "Full Name": lambda context, fake: fake.name,
+    "First Name": lambda context, fake: fake.first_name,
+    "Last Name": lambda context, fake: fake.last_name,
+    "Email": lambda context, fake: fake.email,
+    "Phone Number": lambda context, fake: fake.phone_number,
+    "Address": lambda context, fake: lambda: fake.address().replace('\n', ', '),
+    "City": lambda context, fake: fake.city,
+    "Country": lambda context, fake: fake.country,
+    "Postal Code": lambda context, fake: fake.postcode,
+    "Date of Birth": lambda context, fake: parameterized_generator(
+        context, "Date of Birth", FIELD_PARAMETERS["Date of Birth"], fake),
+    "Username": lambda context, fake: fake.user_name,
+    "Password": lambda context, fake: lambda: fake.password(length=context.random.randint(8, 16), special_chars=True),
+    "Text": lambda context, fake: parameterized_generator(context, "Text", FIELD_PARAMETERS["Text"], fake),
+    "Number": lambda context, fake: parameterized_generator(context, "Number", FIELD_PARAMETERS["Number"], fake),
+    "Boolean": lambda context, fake: lambda: context.random.choice([True, False]),
+    "UUID": lambda context, fake: lambda: str(uuid.UUID(int=context.random.getrandbits(128), version=4)),
+    "Job Title": lambda context, fake: fake.job,
+    "Company": lambda context, fake: fake.company,
+    "Credit Card": lambda context, fake: _credit_card_generator(fake),
+    "URL": lambda context, fake: fake.url,
+}
+
+def resolve_params(field_type, params, field_name=None):
+    """
+    Validate a field's parameters and fill in the defaults.
+    
+    Args:
+        field_type (str): Type of the field
+        params (dict): Parameters from the field definition
+        field_name (str): Name of the field, for error messages
+        
+    Returns:
+        dict: Every parameter of the type, with its value
+    """
+    label = f"field '{field_name}'" if field_name else field_type
+    if not isinstance(params, dict):
+        raise ValueError(f"Parameters for {label} must be a mapping")
+    
+    defaults = FIELD_PARAMETERS.get(field_type, {})
+    unknown = set(params) - set(defaults)
+    if unknown:
+        supported = ", ".join(defaults) or "none"
+        raise ValueError(
+            f"Unknown parameter(s) for {label}: {', '.join(sorted(unknown))} (supported: {supported})"
+        )
+    
+    resolved = dict(defaults, **params)
+    for name, value in resolved.items():
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError(f"Parameter '{name}' for {label} must be a whole number")
+    
+    if field_type == "Number":
+        if resolved["min"] > resolved["max"]:
+            raise ValueError(f"'min' must not be greater than 'max' for {label}")
+        if resolved["min"] < NUMBER_MIN or resolved["max"] > NUMBER_MAX:
+            raise ValueError(f"'min' and 'max' for {label} must be between -2**63 and 2**63-1")
+    if field_type == "Text" and resolved["sentences"] < 1:
+        raise ValueError(f"'sentences' must be at least 1 for {label}")
+    if field_type == "Date of Birth":
+        if resolved["min_age"] < 0 or resolved["min_age"] > resolved["max_age"]:
+            raise ValueError(f"Ages for {label} need 0 <= min_age <= max_age")
+    
+    return resolved
+
+def parameterized_generator(context, field_type, params, fake=None):
+    """
+    Build the generator for a field type with its parameters applied.
+    
+    Parameters are bound once here, so producing a value costs the same as
+    for an unparameterized field.
+    
+    Args:
+        context (GeneratorContext): Context the generator draws from
+        field_type (str): "Number", "Text" or "Date of Birth"
+        params (dict): Parameters as returned by resolve_params
+        fake: Faker instance to use instead of the context's
+        
+    Returns:
+        callable: Zero-argument generator
+    """
+    if context.multilocale and FIELD_PROVIDERS.get(field_type):
+        return _locale_generator(context, context.locale_weights, {
+            locale: parameterized_generator(context.locale_context(locale), field_type, params)
+            for locale, _ in context.locale_weights
+        })
+    
+    fake = _faker_for(context, field_type, fake)
+    
+    if field_type == "Number":
+        randint = context.random.randint
+        minimum, maximum = params["min"], params["max"]
+        return lambda: randint(minimum, maximum)
+    
+    if field_type == "Text":
+        sentences = params["sentences"]
+        return lambda: fake.paragraph(nb_sentences=sentences)
+    
+    if field_type == "Date of Birth":
+        minimum_age, maximum_age = params["min_age"], params["max_age"]
+        return lambda: fake.date_of_birth(minimum_age=minimum_age, maximum_age=maximum_age).strftime("%Y-%m-%d")
+    
+    raise ValueError(f"Field type {field_type} takes no parameters")
+
+# Shared context used when callers don't supply their own; creating it
+# doesn't load Faker
+default_context = GeneratorContext()
+
+# Field type -> generator table of the default context; generators are
+# built on first use and then reused
+FIELD_GENERATORS = default_context.generators
+
+def __getattr__(name):
+    # The default context's Faker instance, created on first use
+    if name == "fake":
+        return default_context.fake
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def generate_field_value(field_type, context=None):
     """
     Generate a value for a specific field type.
     
     Args:
         field_type (str): The type of data to generate
+        context (GeneratorContext): Random state to generate with
         
     Returns:
         The generated value of appropriate type
     """
-    # Map field types to generator functions
-    generators = {
-        "Full Name": lambda: fake.name(),
-        "First Name": lambda: fake.first_name(),
-        "Last Name": lambda: fake.last_name(),
-        "Email": lambda: fake.email(),
-        "Phone Number": lambda: fake.phone_number(),
-        "Address": lambda: fake.address().replace('\n', ', '),
-        "City": lambda: fake.city(),
-        "Country": lambda: fake.country(),
-        "Postal Code": lambda: fake.postcode(),
-        "Date of Birth": lambda: fake.date_of_birth(minimum_age=18, maximum_age=90).strftime("%Y-%m-%d"),
-        "Username": lambda: fake.user_name(),
-        "Password": lambda: fake.password(length=random.randint(8, 16), special_chars=True),
-        "Text": lambda: fake.paragraph(nb_sentences=2),
-        "Number": lambda: random.randint(1, 1000),
-        "Boolean": lambda: random.choice([True, False]),
-        "UUID": lambda: str(uuid.uuid4()),
-        "Job Title": lambda: fake.job(),
-        "Company": lambda: fake.company(),
-        "Credit Card": lambda: {
-            "number": fake.credit_card_number(),
-            "expiry": fake.credit_card_expire(),
-            "provider": fake.credit_card_provider()
-        },
-        "URL": lambda: fake.url()
-    }
+    if context is None:
+        context = default_context
+    generators = context.generators
     
     # Check if the field type is supported
     if field_type not in generators:
@@ -87,37 +689,357 @@ def generate_field_value(field_type):
     # Generate and return the value
     return generators[field_type]()
 
-def generate_custom_field(field_type, **kwargs):
+def validate_fields(fields):
+    """
+    Check a field list without compiling it.
+    
+    Runs every check compile_schema does (names, types, parameters, pool
+    sizes, unique flags and locales) but builds no generators or pools, so
+    it's cheap enough to run before handing the fields to workers that
+    compile them themselves.
+    
+    Args:
+        fields (list): List of dictionaries with 'name' and 'type' keys
+        
+    Returns:
+        list: (name, type, resolved params or None, pool size, unique,
+            locale weights) for every field
+    """
+    if not fields:
+        raise ValueError("No fields provided for data generation")
+    
+    names = set()
+    specs = []
+    for field in fields:
+        field_name = field.get("name")
+        field_type = field.get("type")
+        
+        if not field_name:
+            raise ValueError("Every field needs a name")
+        if field_name in names:
+            raise ValueError(f"Duplicate field name: {field_name}")
+        if field_type not in FIELD_PROVIDERS:
+            raise ValueError(f"Unsupported field type: {field_type}")
+        
+        params = field.get("params")
+        if params:
+            params = resolve_params(field_type, params, field_name)
+        
+        pool_size = field.get("pool")
+        if pool_size is not None:
+            if not isinstance(pool_size, int) or isinstance(pool_size, bool) or pool_size <= 0:
+                raise ValueError(f"Pool size for field '{field_name}' must be a positive integer")
+        
+        unique = field.get("unique", False)
+        if not isinstance(unique, bool):
+            raise ValueError(f"'unique' for field '{field_name}' must be true or false")
+        
+        weights = locales.parse_locales(field.get("locale"), f"field '{field_name}'")
+        
+        names.add(field_name)
+        specs.append((field_name, field_type, params or None, pool_size, unique, weights))
+    return specs
+
+class CompiledSchema:
+    """
+    A field list resolved to generator callables ahead of time.
+    
+    Compiling validates every field once, up front, and leaves the per-row
+    work as nothing more than calling the precompiled generators, which are
+    bound to the schema's GeneratorContext.
+    
+    Records are built a column at a time: each field resolves to a column
+    function taking a row count, which is a vectorized NumPy generator where
+    one exists for the type and a loop over the scalar generator otherwise.
+    Fields with a "pool" size sample from a pre-generated ValuePool instead.
+    Fields with "params" (see FIELD_PARAMETERS) get generators and columns
+    specialized for those parameters.
+    Fields marked "unique" regenerate duplicates within each chunk; see
+    uniqueness.py for how runs keep them unique across chunks.
+    Fields with a "locale" use that locale, or weighting of locales,
+    instead of the context's. The Faker fields of a multi-locale schema
+    are compiled once per locale, against the context's child contexts,
+    and each column is assembled from the rows of every locale.
+    
+    With a GenerationProfile, every column and Faker call is timed and
+    recorded in the profile.
+    """
+    
+    def __init__(self, fields, context=None, profile=None):
+        if context is None:
+            context = default_context
+        
+        # Context -> (Faker stand-in, generator table) to compile against
+        bindings = {}
+        
+        def bind(context, field_type):
+            if profile is None or not FIELD_PROVIDERS[field_type]:
+                return None, context.generators
+            if context not in bindings:
+                fake = profile.wrap_faker(context.fake)
+                bindings[context] = (fake, _field_generators(context, fake))
+            return bindings[context]
+        
+        names = []
+        generators = []
+        columns = []
+        for field_name, field_type, params, pool_size, unique, weights in validate_fields(fields):
+            if weights is not None and weights == context.locale_weights:
+                weights = None
+            if not FIELD_PROVIDERS[field_type] or (weights is None and not context.multilocale):
+                # Types that don't use Faker ignore the locale
+                generate, column = _compile_column(
+                    context, field_type, params, pool_size, unique, *bind(context, field_type)
+                )
+            else:
+                # Duplicates are regenerated per locale, so every row keeps
+                # its locale; the rare ones across locales are left to the
+                # run's UniqueTracker
+                compiled = {
+                    locale: _compile_column(
+                        context.locale_context(locale), field_type, params, pool_size, unique,
+                        *bind(context.locale_context(locale), field_type)
+                    )
+                    for locale, _ in weights or context.locale_weights
+                }
+                generate = _locale_generator(
+                    context, weights or context.locale_weights,
+                    {locale: pair[0] for locale, pair in compiled.items()},
+                )
+                column = _locale_column(
+                    context, weights, {locale: pair[1] for locale, pair in compiled.items()},
+                )
+            
+            if profile is not None:
+                column = profile.time_column(field_name, field_type, column)
+            
+            names.append(field_name)
+            generators.append(generate)
+            columns.append(column)
+        
+        self.context = context
+        self.profile = profile
+        self.fields = [dict(field) for field in fields]
+        self.names = tuple(names)
+        self.generators = tuple(generators)
+        self.columns = tuple(columns)
+    
+    def build_row(self):
+        """Generate a single record"""
+        return dict(zip(self.names, [generate() for generate in self.generators]))
+    
+    def build_column(self, index, count):
+        """Generate `count` values for the field at `index`"""
+        self.context.seed_column(self.names[index])
+        return self.columns[index](count)
+    
+    def build_columns(self, count):
+        """Generate `count` values for every field, as a list of columns"""
+        return [self.build_column(index, count) for index in range(len(self.columns))]
+    
+    def build_rows(self, count):
+        """Generate a list of `count` records"""
+        names = self.names
+        return [dict(zip(names, values)) for values in zip(*self.build_columns(count))]
+
+def _compile_column(context, field_type, params, pool_size, unique, fake=None, generator_table=None):
+    """
+    Build a field's generator and column function against one context.
+    
+    Returns:
+        tuple: (zero-argument generator, column function)
+    """
+    if generator_table is None:
+        generator_table = context.generators
+    if pool_size is not None:
+        pool = context.get_pool(field_type, pool_size, params)
+        generate = pool.sampler(context)
+        column = pool.column(context)
+    elif params:
+        generate = parameterized_generator(context, field_type, params, fake)
+        column = None
+        if context.vectorize:
+            column = vectorized.parameterized_column(context, field_type, params)
+        column = column or _scalar_column(generate)
+    else:
+        generate = generator_table[field_type]
+        column = context.column_generators.get(field_type) or _scalar_column(generate)
+    
+    if unique:
+        column = uniqueness.unique_column(column)
+    return generate, column
+
+def _scalar_column(generate):
+    """Wrap a zero-argument generator as a column function"""
+    return lambda count: [generate() for _ in range(count)]
+
+def _locale_generator(context, weights, generators):
+    """
+    Combine per-locale generators into one drawing each value's locale by weight.
+    
+    Args:
+        context (GeneratorContext): Context whose random state picks the locales
+        weights (tuple): (locale, weight) pairs
+        generators (dict): Locale -> zero-argument generator
+        
+    Returns:
+        callable: Zero-argument generator
+    """
+    if len(weights) == 1:
+        return generators[weights[0][0]]
+    choices = context.random.choices
+    candidates = [generators[locale] for locale, _ in weights]
+    cum_weights = list(itertools.accumulate(weight for _, weight in weights))
+    return lambda: choices(candidates, cum_weights=cum_weights)[0]()
+
+def _locale_column(context, weights, columns):
+    """
+    Combine per-locale column functions into one column.
+    
+    Rows are split by locale and every locale's column function generates
+    its rows in one call, so a mixed column costs about the same as a
+    single-locale one. Each locale's values come from its own reseeded
+    child context, which keeps the column prefix-stable.
+    
+    Args:
+        context (GeneratorContext): Parent context
+        weights (tuple): The field's own (locale, weight) pairs, drawn per
+            value from the context's random state; None to use the
+            context's row locales
+        columns (dict): Locale -> column function
+        
+    Returns:
+        callable: Column function
+    """
+    if weights is not None and len(weights) == 1:
+        return columns[weights[0][0]]
+    if weights is not None:
+        names = [locale for locale, _ in weights]
+        cum_weights = list(itertools.accumulate(weight for _, weight in weights))
+    
+    def column(count):
+        if weights is None:
+            row_locales = context.row_locales(count)
+        else:
+            row_locales = context.random.choices(names, cum_weights=cum_weights, k=count)
+        
+        rows = {locale: [] for locale in columns}
+        for index, locale in enumerate(row_locales):
+            rows[locale].append(index)
+        
+        values = [None] * count
+        for locale, indexes in rows.items():
+            if indexes:
+                for index, value in zip(indexes, columns[locale](len(indexes))):
+                    values[index] = value
+        return values
+    
+    return column
+
+def compile_schema(fields, context=None, profile=None):
+    """
+    Compile a field list for repeated generation.
+    
+    Args:
+        fields (list): List of dictionaries with 'name' and 'type' keys,
+            or an already compiled schema
+        context (GeneratorContext): Random state the generators are bound
+            to, defaults to the shared unseeded context
+        profile (profiling.GenerationProfile): Profile to record column and
+            Faker timings into
+        
+    Returns:
+        CompiledSchema: The compiled schema
+    """
+    if isinstance(fields, CompiledSchema):
+        return fields
+    return CompiledSchema(fields, context, profile)
+
+def generate_custom_field(field_type, context=None, **kwargs):
     """
     Generate a custom field with specific parameters.
-    This function allows for more customized data generation.
+    This function allows for more customized data generation. To generate
+    many values, put the parameters in the field's "params" instead, so
+    they are resolved once rather than per value.
     
     Args:
         field_type (str): The type of data to generate
+        context (GeneratorContext): Random state to generate with
         **kwargs: Additional parameters for customization
         
     Returns:
         The generated value
     """
-    if field_type == "Number":
-        min_val = kwargs.get("min", 1)
-        max_val = kwargs.get("max", 1000)
-        return random.randint(min_val, max_val)
-    
-    elif field_type == "Text":
-        sentences = kwargs.get("sentences", 2)
-        return fake.paragraph(nb_sentences=sentences)
+    if context is None:
+        context = default_context
     
-    elif field_type == "Date of Birth":
-        min_age = kwargs.get("min_age", 18)
-        max_age = kwargs.get("max_age", 90)
-        return fake.date_of_birth(minimum_age=min_age, maximum_age=max_age).strftime("%Y-%m-%d")
+    if field_type in FIELD_PARAMETERS:
+        params = {name: value for name, value in kwargs.items() if name in FIELD_PARAMETERS[field_type]}
+        return parameterized_generator(context, field_type, resolve_params(field_type, params))()
     
     # For other types, fall back to standard generation
-    return generate_field_value(field_type)
+    return generate_field_value(field_type, context)
+
+def read_schema_file(path):
+    """
+    Parse a JSON or YAML schema file without interpreting it.
+    
+    YAML files (.yaml/.yml) need PyYAML.
+    
+    Args:
+        path (str): Path of the schema file
+        
+    Returns:
+        The parsed document
+    """
+    with open(path, encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("Reading YAML schemas requires PyYAML (pip install pyyaml)")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+def load_schema(path):
+    """
+    Load a field list from a JSON or YAML schema file.
+    
+    The file holds either a list of field definitions or a mapping with a
+    "fields" key. YAML files (.yaml/.yml) need PyYAML.
+    
+    Args:
+        path (str): Path of the schema file
+        
+    Returns:
+        list: The field definitions
+    """
+    schema = read_schema_file(path)
+    
+    if isinstance(schema, dict):
+        schema = schema.get("fields")
+    
+    if not isinstance(schema, list) or not all(isinstance(field, dict) for field in schema):
+        raise ValueError(f"Schema file {path} must contain a list of field definitions")
+    
+    return schema
 
 # Additional utility functions for specific data generation needs
 
+def derive_seed(master_seed, index):
+    """
+    Derive an independent, deterministic seed for one shard of a run.
+    
+    Args:
+        master_seed (int): Seed of the whole run
+        index (int): Shard (or chunk) index within the run
+        
+    Returns:
+        int: 64-bit seed for the shard
+    """
+    digest = hashlib.blake2b(f"{master_seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
 def generate_sequential_id(start=1):
     """Generator function for sequential IDs"""
     current_id = start
@@ -125,8 +1047,11 @@ def generate_sequential_id(start=1):
         yield current_id
         current_id += 1
 
-def generate_date_in_range(start_date, end_date=None):
+def generate_date_in_range(start_date, end_date=None, context=None):
     """Generate a random date within a specified range"""
+    if context is None:
+        context = default_context
+    
     if end_date is None:
         end_date = datetime.now()
     
@@ -137,5 +1062,5 @@ def generate_date_in_range(start_date, end_date=None):
         end_date = datetime.strptime(end_date, "%Y-%m-%d")
     
     delta = end_date - start_date
-    random_days = random.randint(0, delta.days)
+    random_days = context.random.randint(0, delta.days)
     return (start_date + timedelta(days=random_days)).strftime("%Y-%m-%d")
@@ -0,0 +1,309 @@
+"""
+Database sinks: load generated records straight into a table.
+
+Loading directly skips writing and re-reading an intermediate CSV file.
+The table is created from the field list: "Number" becomes an integer
+column, "Boolean" a boolean, "Date of Birth" a date, "Credit Card" one text
+column per part (`card_number`, `card_expiry`, `card_provider`) and
+everything else text.
+
+Rows are loaded in batches of `batch_size` inside large transactions that
+are committed every `commit_interval` rows:
+
+* SQLite (standard library) uses `executemany` with a prepared INSERT.
+* PostgreSQL and compatible servers use the COPY protocol through psycopg
+  (version 3), or psycopg2 if that's what is installed. Either is optional
+  and only imported when a PostgreSQL target is used.
+
+Targets are a SQLite file name (or `sqlite:///path`) or a
+`postgresql://` connection URL.
+"""
+
+import importlib.util
+import io
+import sqlite3
+import time
+
+from data_generator import track_progress
+from exporters import RecordWriter, flat_columns, flat_rows
+
+# Rows per executemany / COPY call
+DEFAULT_BATCH_SIZE = 10000
+
+# Rows per transaction
+DEFAULT_COMMIT_INTERVAL = 100000
+
+DEFAULT_TABLE = "records"
+
+# What to do when the table already exists
+IF_EXISTS_OPTIONS = ("replace", "append", "fail")
+
+POSTGRES_SCHEMES = ("postgresql://", "postgres://")
+
+# Characters escaped in COPY's text format
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def quote_identifier(name):
+    """Quote a table or column name for SQL"""
+    return '"' + name.replace('"', '""') + '"'
+
+def is_database_target(target):
+    """True if `target` is a database URL rather than a file name"""
+    return target.startswith(POSTGRES_SCHEMES + ("sqlite:///",))
+
+def database_format(target):
+    """
+    Work out the database format from a target.
+
+    Args:
+        target (str): SQLite file name or connection URL
+
+    Returns:
+        str: "PostgreSQL" or "SQLite"
+    """
+    return "PostgreSQL" if target.startswith(POSTGRES_SCHEMES) else "SQLite"
+
+class TableWriter(RecordWriter):
+    """
+    Base class for writers that load records into a database table.
+
+    Records are buffered until a full batch is available, which is then
+    loaded with `_load_batch`. The transaction is committed every
+    `commit_interval` rows and on close; if the writer is left through an
+    exception the open transaction is rolled back instead.
+
+    Subclasses set the SQL type map and implement `_load_batch`.
+    """
+
+    TYPES = {}
+    DEFAULT_TYPE = "text"
+    appendable = False
+    compressible = False
+
+    def __init__(self, connection, fields, table=DEFAULT_TABLE, batch_size=DEFAULT_BATCH_SIZE,
+                 commit_interval=DEFAULT_COMMIT_INTERVAL, if_exists="replace"):
+        if not fields:
+            raise ValueError("Database export needs the field list")
+        if batch_size <= 0:
+            raise ValueError("Batch size must be a positive number")
+        if commit_interval <= 0:
+            raise ValueError("Commit interval must be a positive number")
+        if if_exists not in IF_EXISTS_OPTIONS:
+            raise ValueError(f"if_exists must be one of: {', '.join(IF_EXISTS_OPTIONS)}")
+
+        super().__init__(None, fields)
+        self.connection = connection
+        self.table = table
+        self.columns = flat_columns(fields)
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self._pending = []
+        self._uncommitted = 0
+        self._create_table(if_exists)
+
+    def create_table_sql(self, if_exists="fail"):
+        """The CREATE TABLE statement for the field list"""
+        columns = ", ".join(
+            f"{quote_identifier(name)} {self.TYPES.get(field_type, self.DEFAULT_TYPE)}"
+            for name, field_type in self.columns
+        )
+        exists = "IF NOT EXISTS " if if_exists == "append" else ""
+        return f"CREATE TABLE {exists}{quote_identifier(self.table)} ({columns})"
+
+    def _create_table(self, if_exists):
+        cursor = self.connection.cursor()
+        if if_exists == "replace":
+            cursor.execute(f"DROP TABLE IF EXISTS {quote_identifier(self.table)}")
+        cursor.execute(self.create_table_sql(if_exists))
+        cursor.close()
+
+    def write_chunk(self, records):
+        if not records:
+            return
+
+        self._pending.extend(flat_rows(records, self.fields))
+        while len(self._pending) >= self.batch_size:
+            self._flush(self.batch_size)
+
+    def close(self):
+        if self._pending:
+            self._flush(len(self._pending))
+        self.connection.commit()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is not None:
+            self.connection.rollback()
+        return super().__exit__(exc_type, exc_value, tb)
+
+    def _flush(self, rows):
+        """Load the first `rows` buffered rows, committing when the interval is reached"""
+        batch = self._pending[:rows]
+        del self._pending[:rows]
+
+        self._load_batch(batch)
+        self.records_written += len(batch)
+        self._uncommitted += len(batch)
+
+        if self._uncommitted >= self.commit_interval:
+            self.connection.commit()
+            self._uncommitted = 0
+
+    def _load_batch(self, rows):
+        raise NotImplementedError
+
+class SQLiteWriter(TableWriter):
+    """Load records into a SQLite table with executemany"""
+
+    TYPES = {"Number": "INTEGER", "Boolean": "BOOLEAN", "Date of Birth": "DATE"}
+    DEFAULT_TYPE = "TEXT"
+
+    def __init__(self, connection, fields, **options):
+        super().__init__(connection, fields, **options)
+        placeholders = ", ".join("?" for _ in self.columns)
+        names = ", ".join(quote_identifier(name) for name, _ in self.columns)
+        self._insert = f"INSERT INTO {quote_identifier(self.table)} ({names}) VALUES ({placeholders})"
+
+    def _load_batch(self, rows):
+        self.connection.executemany(self._insert, rows)
+
+class PostgresWriter(TableWriter):
+    """
+    Load records into a PostgreSQL table with COPY.
+
+    Works with psycopg (3) connections, streaming rows through
+    `cursor.copy`, and with psycopg2 connections, sending each batch in
+    COPY's text format through `copy_expert` (see `copy_text_rows`).
+    """
+
+    TYPES = {"Number": "bigint", "Boolean": "boolean", "Date of Birth": "date"}
+
+    def __init__(self, connection, fields, **options):
+        super().__init__(connection, fields, **options)
+        names = ", ".join(quote_identifier(name) for name, _ in self.columns)
+        self._copy = f"COPY {quote_identifier(self.table)} ({names}) FROM STDIN"
+        self._psycopg3 = not type(connection).__module__.startswith("psycopg2")
+
+    def _load_batch(self, rows):
+        cursor = self.connection.cursor()
+        try:
+            if self._psycopg3:
+                with cursor.copy(self._copy) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+            else:
+                cursor.copy_expert(self._copy, io.StringIO(copy_text_rows(rows)))
+        finally:
+            cursor.close()
+
+def copy_text_value(value):
+    """Encode a value for COPY's text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(COPY_ESCAPES)
+
+def copy_text_rows(rows):
+    """
+    Encode rows as COPY's text format: tab-separated, one row per line.
+
+    NULLs are written as \\N and backslashes, tabs, newlines and carriage
+    returns in values are escaped, so empty strings stay empty strings
+    (CSV can only tell them from NULLs by quoting).
+
+    Args:
+        rows (list): Tuples of column values
+
+    Returns:
+        str: The encoded rows
+    """
+    return "".join("\t".join(map(copy_text_value, row)) + "\n" for row in rows)
+
+def writer_class(export_format):
+    """
+    Look up the writer class for a database format.
+
+    Args:
+        export_format (str): "SQLite" or "PostgreSQL"
+
+    Returns:
+        type: TableWriter subclass
+    """
+    if export_format == "SQLite":
+        return SQLiteWriter
+    if export_format == "PostgreSQL":
+        if not any(importlib.util.find_spec(name) for name in ("psycopg", "psycopg2")):
+            raise ValueError("PostgreSQL export requires psycopg (pip install psycopg)")
+        return PostgresWriter
+    raise ValueError(f"Unsupported database format: {export_format}")
+
+def connect(target, export_format=None):
+    """
+    Open a connection to a database target.
+
+    Args:
+        target (str): SQLite file name, `sqlite:///path` (four slashes for
+            an absolute path) or a
+            `postgresql://` connection URL
+        export_format (str): "SQLite" or "PostgreSQL"; worked out from the
+            target if omitted
+
+    Returns:
+        A DB-API connection
+    """
+    export_format = export_format or database_format(target)
+    writer_class(export_format)  # Fail early on unknown formats and missing drivers
+
+    if export_format == "SQLite":
+        if target.startswith("sqlite:///"):
+            # sqlite:///relative.db, sqlite:////absolute/path.db
+            target = target[len("sqlite:///"):] or ":memory:"
+        return sqlite3.connect(target)
+
+    if importlib.util.find_spec("psycopg"):
+        import psycopg
+        return psycopg.connect(target)
+    import psycopg2
+    return psycopg2.connect(target)
+
+def export_to_database(chunks, target, fields, export_format=None, table=DEFAULT_TABLE,
+                       total=None, progress=None, cancel=None, profile=None, **options):
+    """
+    Stream chunks of records into a database table.
+
+    If the run is cancelled or fails, the uncommitted part of the load is
+    rolled back; batches committed before that stay in the table.
+
+    Args:
+        chunks (iterable): Iterable of lists of record dictionaries
+        target (str): SQLite file name or connection URL (see `connect`)
+        fields (list): Field definitions the table is created from
+        export_format (str): "SQLite" or "PostgreSQL"; worked out from the
+            target if omitted
+        table (str): Name of the table to load into
+        total (int): Expected number of records, for progress reporting
+        progress (callable): Called with a data_generator.Progress after
+            every chunk is loaded
+        cancel (CancellationToken): Token to stop the load early
+        profile (profiling.GenerationProfile): Profile to record the load
+            time into, as the "export" phase
+        **options: `batch_size`, `commit_interval` and `if_exists`
+            ("replace", "append" or "fail")
+
+    Returns:
+        int: Number of records loaded
+    """
+    export_format = export_format or database_format(target)
+    connection = connect(target, export_format)
+
+    try:
+        with writer_class(export_format)(connection, fields, table=table, **options) as writer:
+            for chunk in track_progress(chunks, total, progress, cancel):
+                start = time.perf_counter()
+                writer.write_chunk(chunk)
+                if profile is not None:
+                    profile.add_phase("export", time.perf_counter() - start, len(chunk))
+    finally:
+        connection.close()
+
+    return writer.records_written
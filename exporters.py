@@ -0,0 +1,430 @@
+"""
+Streaming exporters for generated records.
+
+Each writer consumes records in chunks and writes them straight to an open
+file, so memory use is bounded by the chunk size rather than the total
+number of records being exported.
+"""
+
+import csv
+import importlib.util
+import io
+import json
+import operator
+import os
+import time
+from functools import partial
+
+from compression import CompressedStream, resolve_compression
+from data_generator import GenerationCancelled, track_progress
+
+# Columnar formats need pyarrow, which is optional
+HAVE_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+# Export formats available in this environment, mapped to file extensions
+EXPORT_FORMATS = {
+    "JSON": ".json",
+    "JSON (compact)": ".json",
+    "JSON Lines": ".jsonl",
+    "CSV": ".csv",
+    "SQLite": ".db",
+}
+
+# Formats loaded into a database (see databases.py) rather than written
+# to a stream; PostgreSQL takes a connection URL instead of a file name
+DATABASE_FORMATS = ("SQLite", "PostgreSQL")
+
+if HAVE_PYARROW:
+    EXPORT_FORMATS["Parquet"] = ".parquet"
+    EXPORT_FORMATS["Arrow IPC"] = ".arrow"
+
+# Nested field types, mapped to the keys of their parts. Tabular outputs
+# store each part in its own "<field>_<part>" column
+NESTED_FIELDS = {"Credit Card": ("number", "expiry", "provider")}
+
+# Output files are written through a large buffer; writers hand over one
+# encoded chunk per write call
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+class JSONSerializer:
+    """
+    Encode values to UTF-8 JSON bytes with the fastest available library.
+
+    Backends, in order of preference: orjson, ujson, then the standard
+    library. Values JSON can't represent are encoded with `str()`, matching
+    the old `json.dump(..., default=str)` behaviour. orjson and ujson only
+    encode integers that fit in 64 bits and don't pass larger ones to
+    `default`, so records they reject are encoded with the standard library
+    instead.
+    """
+
+    BACKENDS = ("orjson", "ujson", "json")
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = next(name for name in self.BACKENDS if importlib.util.find_spec(name))
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unsupported JSON backend: {backend}")
+
+        self.backend = backend
+        if backend == "orjson":
+            import orjson
+            fallback = JSONSerializer("json")
+            self.dumps = _with_fallback(
+                lambda obj: orjson.dumps(obj, default=str), fallback.dumps
+            )
+            self.dumps_indented = _with_fallback(
+                lambda obj: orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2),
+                fallback.dumps_indented,
+            )
+        elif backend == "ujson":
+            import ujson
+            fallback = JSONSerializer("json")
+            options = {"ensure_ascii": False, "escape_forward_slashes": False, "default": str}
+            self.dumps = _with_fallback(
+                lambda obj: ujson.dumps(obj, **options).encode("utf-8"), fallback.dumps
+            )
+            self.dumps_indented = _with_fallback(
+                lambda obj: ujson.dumps(obj, indent=2, **options).encode("utf-8"),
+                fallback.dumps_indented,
+            )
+        else:
+            self.dumps = lambda obj: json.dumps(
+                obj, ensure_ascii=False, default=str, separators=(",", ":")
+            ).encode("utf-8")
+            self.dumps_indented = lambda obj: json.dumps(
+                obj, indent=2, ensure_ascii=False, default=str
+            ).encode("utf-8")
+
+def _with_fallback(dumps, fallback):
+    """Wrap an encoder to retry the values it can't encode with `fallback`"""
+    def encode(obj):
+        try:
+            return dumps(obj)
+        except (TypeError, OverflowError):
+            return fallback(obj)
+    return encode
+
+class RecordWriter:
+    """
+    Base class for streaming record writers.
+
+    Writers take a binary stream. Subclasses implement `write_chunk` and,
+    where the format needs a trailer, `close`. Writers can be used as
+    context managers.
+
+    Writers of `appendable` formats can continue a file cut off after any
+    chunk, which is how checkpointed runs resume. `compressible` formats
+    can be written gzip or zstd compressed (see compression.py).
+    """
+
+    appendable = True
+    compressible = True
+
+    def __init__(self, stream, fields=None):
+        self.stream = stream
+        self.fields = fields
+        self.records_written = 0
+
+    def resume(self, records_written):
+        """Continue a stream that already holds the first `records_written` records"""
+        if not self.appendable:
+            raise ValueError(f"{type(self).__name__} output can't be resumed")
+        self.records_written = records_written
+
+    def write_chunk(self, records):
+        """Write a list of records to the stream"""
+        raise NotImplementedError
+
+    def close(self):
+        """Finish the output (the underlying stream is left open)"""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.close()
+        return False
+
+class JSONArrayWriter(RecordWriter):
+    """
+    Write records as a single JSON array.
+
+    By default the output is pretty-printed exactly like
+    `json.dump(records, f, indent=2)`. With `compact` set, each record is
+    written on its own line without indentation or padding, which makes
+    files noticeably smaller.
+    """
+
+    def __init__(self, stream, fields=None, compact=False, serializer=None):
+        super().__init__(stream, fields)
+        self.compact = compact
+        self.serializer = serializer or JSONSerializer()
+
+    def write_chunk(self, records):
+        if not records:
+            return
+
+        if self.compact:
+            dumps = self.serializer.dumps
+            body = b",\n".join([dumps(record) for record in records])
+        else:
+            dumps = self.serializer.dumps_indented
+            body = b",\n".join([b"  " + dumps(record).replace(b"\n", b"\n  ") for record in records])
+
+        # Open the array on the first chunk, otherwise continue it
+        prefix = b"[\n" if self.records_written == 0 else b",\n"
+        self.stream.write(prefix + body)
+        self.records_written += len(records)
+
+    def close(self):
+        self.stream.write(b"\n]" if self.records_written else b"[]")
+
+class JSONLinesWriter(RecordWriter):
+    """Write records as JSON Lines, one compact object per line"""
+
+    def __init__(self, stream, fields=None, serializer=None):
+        super().__init__(stream, fields)
+        self.serializer = serializer or JSONSerializer()
+
+    def write_chunk(self, records):
+        if not records:
+            return
+
+        dumps = self.serializer.dumps
+        self.stream.write(b"\n".join([dumps(record) for record in records]) + b"\n")
+        self.records_written += len(records)
+
+class CSVWriter(RecordWriter):
+    """
+    Write records as UTF-8 CSV with a header row.
+
+    With a field list, the columns follow the order of the fields and
+    nested fields such as "Credit Card" are flattened into one column per
+    part (`card_number`, `card_expiry`, `card_provider`), the same layout
+    as the database sinks. Rows are built column by column as tuples and
+    written with `csv.writer.writerows`; each chunk is encoded in memory
+    and written with a single call, so the output is produced in a single
+    pass.
+
+    Without a field list, the columns are `fieldnames` or else the keys of
+    the first record, in order.
+    """
+
+    def __init__(self, stream, fields=None, fieldnames=None):
+        super().__init__(stream, fields)
+        self.fieldnames = fieldnames
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._rows = None
+        self._write_header = True
+
+    def resume(self, records_written):
+        super().resume(records_written)
+        self._write_header = records_written == 0
+
+    def write_chunk(self, records):
+        if not records:
+            return
+
+        if self._rows is None:
+            self._rows = self._row_builder(records[0])
+            if self._write_header:
+                self._writer.writerow(self.fieldnames)
+
+        self._writer.writerows(self._rows(records))
+        self.stream.write(self._buffer.getvalue().encode("utf-8"))
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self.records_written += len(records)
+
+    def _row_builder(self, first_record):
+        """Settle the columns and return a function turning records into rows"""
+        if self.fieldnames is None and self.fields:
+            self.fieldnames = [name for name, _ in flat_columns(self.fields)]
+            fields = self.fields
+            return lambda records: flat_rows(records, fields)
+
+        if self.fieldnames is None:
+            self.fieldnames = list(first_record)
+        if len(self.fieldnames) == 1:
+            name = self.fieldnames[0]
+            return lambda records: [(record[name],) for record in records]
+        return partial(map, operator.itemgetter(*self.fieldnames))
+
+def flat_columns(fields):
+    """
+    List the columns of a field list with nested types flattened.
+
+    Args:
+        fields (list): List of dictionaries with 'name' and 'type' keys
+
+    Returns:
+        list: (column name, field type) tuples; the parts of nested fields
+            have a type of None
+    """
+    columns = []
+    for field in fields:
+        parts = NESTED_FIELDS.get(field["type"])
+        if parts:
+            columns.extend((f"{field['name']}_{part}", None) for part in parts)
+        else:
+            columns.append((field["name"], field["type"]))
+    return columns
+
+def flat_rows(records, fields):
+    """
+    Turn records into tuples, one value per column of `flat_columns`.
+
+    Args:
+        records (list): Record dictionaries
+        fields (list): Field definitions the records were generated from
+
+    Returns:
+        list: One tuple per record
+    """
+    columns = []
+    for field in fields:
+        values = [record[field["name"]] for record in records]
+        parts = NESTED_FIELDS.get(field["type"])
+        if parts:
+            columns.extend([value[part] for value in values] for part in parts)
+        else:
+            columns.append(values)
+    return list(zip(*columns))
+
+def writer_class(export_format):
+    """
+    Look up the writer class for an export format.
+
+    Args:
+        export_format (str): Name of the export format
+
+    Returns:
+        type: RecordWriter subclass
+    """
+    if export_format in DATABASE_FORMATS:
+        import databases
+        return databases.writer_class(export_format)
+
+    if export_format in ("Parquet", "Arrow IPC"):
+        if not HAVE_PYARROW:
+            raise ValueError(f"{export_format} export requires pyarrow (pip install pyarrow)")
+        import columnar
+        return columnar.ParquetWriter if export_format == "Parquet" else columnar.ArrowIPCWriter
+
+    writers = {
+        "JSON": JSONArrayWriter,
+        "JSON (compact)": JSONArrayWriter,
+        "JSON Lines": JSONLinesWriter,
+        "CSV": CSVWriter,
+    }
+
+    if export_format not in writers:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    return writers[export_format]
+
+def open_writer(stream, export_format, fields=None, **options):
+    """
+    Create a writer for the given export format.
+
+    Args:
+        stream: Binary stream to write to
+        export_format (str): One of the keys in EXPORT_FORMATS
+        fields (list): Field definitions; required by the columnar formats
+        **options: Format specific options, e.g. `row_group_size` and
+            `compression` for Parquet and Arrow IPC, or `serializer` for
+            the JSON formats
+
+    Returns:
+        RecordWriter: Writer bound to the stream
+    """
+    if export_format == "JSON (compact)":
+        options.setdefault("compact", True)
+    return writer_class(export_format)(stream, fields, **options)
+
+def output_compression(export_format, output_file=None, compress=None):
+    """
+    Work out the compression of an export and check the format allows it.
+
+    Args:
+        export_format (str): One of the keys in EXPORT_FORMATS
+        output_file (str): Output path; ".gz" and ".zst" files are
+            compressed unless `compress` says otherwise
+        compress (str): "gzip" or "zstd"
+
+    Returns:
+        str: "gzip", "zstd" or None
+    """
+    cls = writer_class(export_format)
+    if export_format in DATABASE_FORMATS:
+        output_file = None
+    compress = resolve_compression(compress, output_file)
+    if compress is not None and not cls.compressible:
+        raise ValueError(f"{export_format} output can't be {compress} compressed")
+    return compress
+
+def export_records(chunks, output_file, export_format, fields=None, total=None,
+                   progress=None, cancel=None, profile=None, compress=None, **options):
+    """
+    Stream chunks of records into a file.
+
+    If the run is cancelled the partially written file is removed and
+    GenerationCancelled is raised.
+
+    Text formats are written compressed when `compress` is given or the
+    file name ends in ".gz" or ".zst".
+
+    Args:
+        chunks (iterable): Iterable of lists of record dictionaries,
+            e.g. from `data_generator.iter_record_chunks`
+        output_file (str): Path of the file to write; for the database
+            formats, the database file or connection URL
+        export_format (str): One of the keys in EXPORT_FORMATS
+        fields (list): Field definitions; required by the columnar formats
+        total (int): Expected number of records, for progress reporting
+        progress (callable): Called with a data_generator.Progress after
+            every chunk is written
+        cancel (CancellationToken): Token to stop the export early
+        profile (profiling.GenerationProfile): Profile to record the time
+            spent writing into, as the "export" phase
+        compress (str): "gzip" or "zstd"; taken from the file extension if
+            omitted
+        **options: Format specific writer options
+
+    Returns:
+        int: Number of records written
+    """
+    # Fails on unknown formats before creating the file
+    compress = output_compression(export_format, output_file, compress)
+
+    if export_format in DATABASE_FORMATS:
+        import databases
+        return databases.export_to_database(
+            chunks, output_file, fields, export_format, total=total,
+            progress=progress, cancel=cancel, profile=profile, **options
+        )
+
+    f = open(output_file, 'wb', buffering=WRITE_BUFFER_SIZE)
+    stream = f if compress is None else CompressedStream(f, compress)
+
+    try:
+        with f:
+            with open_writer(stream, export_format, fields, **options) as writer:
+                for chunk in track_progress(chunks, total, progress, cancel):
+                    if profile is None:
+                        writer.write_chunk(chunk)
+                        continue
+                    start = time.perf_counter()
+                    writer.write_chunk(chunk)
+                    profile.add_phase("export", time.perf_counter() - start, len(chunk))
+            if compress is not None:
+                stream.close()
+    except GenerationCancelled:
+        os.remove(output_file)
+        raise
+
+    return writer.records_written
@@ -1,18 +1,31 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import json
-import csv
-import os
+import queue
+import random
 import threading
 import time
-from data_generator import generate_data
+from checkpoint import checkpoint_path, export_resumable, read_manifest
+from compression import COMPRESSIONS, strip_compression_suffix
+from data_generator import (
+    DEFAULT_CHUNK_SIZE, FIELD_PARAMETERS, FIELD_TYPES, CancellationToken, GenerationCancelled, load_schema, resolve_params,
+    validate_fields,
+)
+from exporters import DATABASE_FORMATS, EXPORT_FORMATS, export_records, output_compression, writer_class
+from parallel import iter_parallel_chunks
+from pipeline import export_pipelined
+from preview import PreviewSample, count_pages, format_value
+from profiling import GenerationProfile
+
+# Minimum seconds between progress updates sent to the UI
+PROGRESS_UPDATE_INTERVAL = 0.1
 
 class DataGeneratorApp:
     def __init__(self, root):
         self.root = root
         self.root.title("User Data Generator")
-        self.root.geometry("800x600")
-        self.root.minsize(700, 500)
+        self.root.geometry("800x800")
+        self.root.minsize(700, 650)
         
         # Set application icon if available
         try:
@@ -23,6 +36,22 @@ class DataGeneratorApp:
         # Initialize variables
         self.fields = []  # List to store field definitions
         self.is_generating = False
+        self.cancel_token = None
+        self.profile_frame = None
+        self._last_progress_update = 0.0
+        # Seed used when none is entered, so the preview shows what will be generated
+        self.session_seed = random.SystemRandom().getrandbits(63)
+        self.preview = PreviewSample(self.session_seed)
+        self.preview_seed = self.session_seed
+        self.preview_limit = self.preview.limit
+        self.preview_page = 0
+        self._preview_columns = ()
+        self._preview_shown = None
+        self._preview_scroll = 0
+        # Preview pages are generated by a background thread, which owns
+        # self.preview; the main loop only sends it requests
+        self._preview_requests = queue.Queue()
+        threading.Thread(target=self._preview_thread, daemon=True).start()
         self.setup_ui()
         
     def setup_ui(self):
@@ -40,6 +69,9 @@ class DataGeneratorApp:
         # Create bottom section for action buttons
         self.create_action_section(main_frame)
         
+        # Create preview of the first rows below the buttons
+        self.create_preview_section(main_frame)
+        
         # Create status bar
         self.status_var = tk.StringVar(value="Ready")
         status_bar = ttk.Label(self.root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
@@ -87,17 +119,27 @@ class DataGeneratorApp:
         ttk.Label(input_frame, text="Field Type:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
         self.field_type_var = tk.StringVar()
         
-        # List of supported field types
-        field_types = [
-            "Full Name", "First Name", "Last Name", "Email", "Phone Number",
-            "Address", "City", "Country", "Postal Code", "Date of Birth",
-            "Username", "Password", "Text", "Number", "Boolean", "UUID",
-            "Job Title", "Company", "Credit Card", "URL"
-        ]
-        
-        field_type_combo = ttk.Combobox(input_frame, textvariable=self.field_type_var, values=field_types)
+        field_type_combo = ttk.Combobox(input_frame, textvariable=self.field_type_var, values=FIELD_TYPES)
         field_type_combo.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=5, pady=5)
         field_type_combo.current(0)  # Set default selection
+        field_type_combo.bind('<<ComboboxSelected>>', lambda event: self._update_params_hint())
+        
+        # Optional value pool size (distinct values to sample rows from)
+        ttk.Label(input_frame, text="Pool Size (optional):").grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
+        self.field_pool_var = tk.StringVar()
+        ttk.Entry(input_frame, textvariable=self.field_pool_var, width=10).grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        # Type specific parameters, e.g. "min=1, max=100" for numbers
+        ttk.Label(input_frame, text="Parameters (optional):").grid(row=3, column=0, sticky=tk.W, padx=5, pady=5)
+        self.field_params_var = tk.StringVar()
+        ttk.Entry(input_frame, textvariable=self.field_params_var).grid(row=3, column=1, sticky=(tk.W, tk.E), padx=5, pady=5)
+        self.field_params_hint_var = tk.StringVar()
+        ttk.Label(input_frame, textvariable=self.field_params_hint_var, foreground="gray").grid(row=4, column=1, sticky=tk.W, padx=5)
+        self._update_params_hint()
+        
+        # Never repeat a value within a run (for unique indexes)
+        self.field_unique_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(input_frame, text="Unique values", variable=self.field_unique_var).grid(row=5, column=1, sticky=tk.W, padx=5, pady=5)
         
         # Field action buttons
         button_frame = ttk.Frame(right_frame)
@@ -121,7 +163,7 @@ class DataGeneratorApp:
         # Export format
         ttk.Label(settings_frame, text="Export Format:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
         self.export_format_var = tk.StringVar(value="JSON")
-        ttk.Combobox(settings_frame, textvariable=self.export_format_var, values=["JSON", "CSV"], width=10).grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Combobox(settings_frame, textvariable=self.export_format_var, values=list(EXPORT_FORMATS), width=10).grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
         
         # Output file
         ttk.Label(settings_frame, text="Output File:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
@@ -132,6 +174,19 @@ class DataGeneratorApp:
         ttk.Entry(file_frame, textvariable=self.output_file_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
         ttk.Button(file_frame, text="Browse...", command=self.browse_output_file).pack(side=tk.RIGHT, padx=(5, 0))
         
+        # Optional seed for reproducible output
+        ttk.Label(settings_frame, text="Seed (optional):").grid(row=3, column=0, sticky=tk.W, padx=5, pady=5)
+        self.seed_var = tk.StringVar()
+        ttk.Entry(settings_frame, textvariable=self.seed_var, width=10).grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        # Opt-in per-field timing (slows generation down a little)
+        self.profile_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(settings_frame, text="Profile fields", variable=self.profile_var).grid(row=4, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        # Checkpoint file exports so an interrupted run can be continued
+        self.resume_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(settings_frame, text="Resume interrupted runs", variable=self.resume_var).grid(row=5, column=1, sticky=tk.W, padx=5, pady=5)
+        
     def create_action_section(self, parent):
         """Create the action buttons section"""
         action_frame = ttk.Frame(parent, padding="10")
@@ -142,14 +197,135 @@ class DataGeneratorApp:
         self.progress_bar = ttk.Progressbar(action_frame, variable=self.progress_var, maximum=100)
         self.progress_bar.pack(fill=tk.X, pady=(0, 10))
         
-        # Generate button
+        # Generate and cancel buttons
+        button_frame = ttk.Frame(action_frame)
+        button_frame.pack(pady=5)
+        
         generate_btn = ttk.Button(
-            action_frame, 
+            button_frame, 
             text="Generate Data", 
             command=self.generate_data,
             style="Generate.TButton"
         )
-        generate_btn.pack(pady=5)
+        generate_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.cancel_btn = ttk.Button(button_frame, text="Cancel", command=self.cancel_generation, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
+        
+    def create_preview_section(self, parent):
+        """Create the live preview of the first rows the current schema generates"""
+        preview_frame = ttk.LabelFrame(parent, text="Preview", padding="10")
+        preview_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        nav_frame = ttk.Frame(preview_frame)
+        nav_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(5, 0))
+        ttk.Button(nav_frame, text="< Prev", command=lambda: self.show_preview_page(self.preview_page - 1)).pack(side=tk.LEFT)
+        ttk.Button(nav_frame, text="Next >", command=lambda: self.show_preview_page(self.preview_page + 1)).pack(side=tk.LEFT, padx=5)
+        self.preview_label_var = tk.StringVar()
+        ttk.Label(nav_frame, textvariable=self.preview_label_var).pack(side=tk.LEFT, padx=5)
+        ttk.Button(nav_frame, text="New Sample", command=self.new_preview_sample).pack(side=tk.RIGHT)
+        
+        # Only the rows of the current page are ever inserted into the tree
+        self.preview_tree = ttk.Treeview(preview_frame, show="headings", height=8)
+        self.preview_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(preview_frame, orient=tk.VERTICAL, command=self.preview_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.preview_tree.config(yscrollcommand=scrollbar.set)
+        
+        # Scrolling past either end of a page turns the page
+        self.preview_tree.bind("<MouseWheel>", lambda event: self._scroll_preview(-event.delta))
+        self.preview_tree.bind("<Button-4>", lambda event: self._scroll_preview(-1))
+        self.preview_tree.bind("<Button-5>", lambda event: self._scroll_preview(1))
+        
+        self.seed_var.trace_add("write", lambda *args: self._reseed_preview())
+        self.num_records_var.trace_add("write", lambda *args: self._resize_preview())
+        self.refresh_preview()
+        self._resize_preview()
+        
+    def create_profile_section(self):
+        """Create the panel listing per-field timings (shown after a profiled run)"""
+        self.profile_frame = ttk.LabelFrame(self.root, text="Profile", padding="10")
+        self.profile_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=15, pady=5)
+        
+        columns = ("field", "type", "seconds", "share")
+        self.profile_tree = ttk.Treeview(self.profile_frame, columns=columns, show="headings", height=5)
+        for column, heading, width in zip(columns, ("Field", "Type", "Seconds", "Share"), (200, 150, 100, 80)):
+            self.profile_tree.heading(column, text=heading)
+            self.profile_tree.column(column, width=width, anchor=tk.W if column in ("field", "type") else tk.E)
+        self.profile_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        scrollbar = ttk.Scrollbar(self.profile_frame, orient=tk.VERTICAL, command=self.profile_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.profile_tree.config(yscrollcommand=scrollbar.set)
+        
+    def _read_pool_size(self):
+        """
+        Parse the pool size entry.
+        
+        Returns:
+            tuple: (ok, pool_size) where pool_size is None when left empty
+        """
+        pool_size = self.field_pool_var.get().strip()
+        if not pool_size:
+            return True, None
+        
+        try:
+            pool_size = int(pool_size)
+        except ValueError:
+            pool_size = 0
+        
+        if pool_size <= 0:
+            messagebox.showerror("Error", "Pool size must be a positive whole number")
+            return False, None
+        
+        return True, pool_size
+        
+    def _read_params(self, field_type):
+        """
+        Parse the parameters entry ("name=value, name=value").
+        
+        Returns:
+            tuple: (ok, params) where params is None when left empty
+        """
+        text = self.field_params_var.get().strip()
+        if not text:
+            return True, None
+        
+        params = {}
+        try:
+            for item in text.split(","):
+                name, sep, value = item.partition("=")
+                if not sep:
+                    raise ValueError(f"Expected name=value, got '{item.strip()}'")
+                try:
+                    params[name.strip()] = int(value)
+                except ValueError:
+                    raise ValueError(f"Parameter '{name.strip()}' must be a whole number")
+            resolve_params(field_type, params)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return False, None
+        
+        return True, params
+        
+    def _update_params_hint(self):
+        """Show the parameters the selected field type accepts"""
+        defaults = FIELD_PARAMETERS.get(self.field_type_var.get())
+        if defaults:
+            self.field_params_hint_var.set("e.g. " + format_params(defaults))
+        else:
+            self.field_params_hint_var.set("(no parameters for this type)")
+        
+    def _make_field(self, field_name, field_type, pool_size, params=None):
+        """Build a field definition from the editor values"""
+        field = {"name": field_name, "type": field_type}
+        if params:
+            field["params"] = params
+        if pool_size is not None:
+            field["pool"] = pool_size
+        if self.field_unique_var.get():
+            field["unique"] = True
+        return field
         
     def add_field(self):
         """Add a new field to the list"""
@@ -160,6 +336,14 @@ class DataGeneratorApp:
             messagebox.showerror("Error", "Field name cannot be empty")
             return
         
+        ok, pool_size = self._read_pool_size()
+        if not ok:
+            return
+        
+        ok, params = self._read_params(field_type)
+        if not ok:
+            return
+        
         # Check for duplicate field names
         for field in self.fields:
             if field["name"] == field_name:
@@ -167,9 +351,12 @@ class DataGeneratorApp:
                 return
         
         # Add the field
-        self.fields.append({"name": field_name, "type": field_type})
+        self.fields.append(self._make_field(field_name, field_type, pool_size, params))
         self.update_field_list()
         self.field_name_var.set("")  # Clear the field name entry
+        self.field_pool_var.set("")
+        self.field_params_var.set("")
+        self.field_unique_var.set(False)
         self.status_var.set(f"Added field: {field_name} ({field_type})")
         
     def update_field(self):
@@ -189,6 +376,14 @@ class DataGeneratorApp:
             messagebox.showerror("Error", "Field name cannot be empty")
             return
         
+        ok, pool_size = self._read_pool_size()
+        if not ok:
+            return
+        
+        ok, params = self._read_params(new_field_type)
+        if not ok:
+            return
+        
         # Check for duplicate field names (excluding the current field)
         for i, field in enumerate(self.fields):
             if i != index and field["name"] == new_field_name:
@@ -196,7 +391,7 @@ class DataGeneratorApp:
                 return
         
         # Update the field
-        self.fields[index] = {"name": new_field_name, "type": new_field_type}
+        self.fields[index] = self._make_field(new_field_name, new_field_type, pool_size, params)
         self.update_field_list()
         self.status_var.set(f"Updated field: {new_field_name} ({new_field_type})")
         
@@ -238,24 +433,199 @@ class DataGeneratorApp:
         
         self.field_name_var.set(field["name"])
         self.field_type_var.set(field["type"])
+        self.field_pool_var.set(str(field.get("pool", "")))
+        self.field_params_var.set(format_params(field.get("params") or {}))
+        self.field_unique_var.set(field.get("unique", False))
+        self._update_params_hint()
         
     def update_field_list(self):
         """Update the field list display"""
         self.field_list.delete(0, tk.END)
         for field in self.fields:
-            self.field_list.insert(tk.END, f"{field['name']} ({field['type']})")
+            label = f"{field['name']} ({field['type']})"
+            if field.get("params"):
+                label += f" [{format_params(field['params'])}]"
+            if "pool" in field:
+                label += f" [pool of {field['pool']}]"
+            if field.get("unique"):
+                label += " [unique]"
+            self.field_list.insert(tk.END, label)
+        self.refresh_preview()
+        
+    def save_schema(self):
+        """Save the field list to a JSON schema file"""
+        if not self.fields:
+            messagebox.showerror("Error", "No fields defined")
+            return
+        
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Schema files", "*.json"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump({"fields": self.fields}, f, indent=2)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not save schema: {e}")
+            return
+        self.status_var.set(f"Saved schema: {filename}")
+        
+    def open_schema(self):
+        """Replace the field list with one from a JSON or YAML schema file"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("Schema files", "*.json *.yaml *.yml"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        
+        try:
+            fields = load_schema(filename)
+            if fields:
+                validate_fields(fields)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not open schema: {e}")
+            return
+        
+        self.fields = [dict(field) for field in fields]
+        self.update_field_list()
+        self.status_var.set(f"Opened schema: {filename} ({len(fields)} fields)")
+        
+    def refresh_preview(self):
+        """Bring the preview in line with the field list, regenerating only the changed columns"""
+        names = tuple(field["name"] for field in self.fields)
+        
+        if names != self._preview_columns:
+            self._preview_columns = names
+            self._preview_shown = None
+            self.preview_tree.delete(*self.preview_tree.get_children())
+            self.preview_tree.config(columns=names)
+            for name in names:
+                self.preview_tree.heading(name, text=name)
+                self.preview_tree.column(name, width=120, anchor=tk.W)
+        self._request_preview()
+        
+    def show_preview_page(self, page):
+        """Show a page of the preview"""
+        self.preview_page = max(0, min(page, count_pages(self.preview_limit, self.preview.page_size) - 1))
+        self._preview_scroll = 0
+        self._request_preview()
+        
+    def new_preview_sample(self):
+        """Pick a new seed for runs without one, and preview it"""
+        self.session_seed = random.SystemRandom().getrandbits(63)
+        self._reseed_preview()
+        
+    def _request_preview(self):
+        """Ask the preview thread for the current page; the rows come back through _show_preview"""
+        self.preview_label_var.set("Generating preview...")
+        fields = [dict(field) for field in self.fields]
+        self._preview_requests.put((fields, self.preview_seed, self.preview_limit, self.preview_page))
+        
+    def _preview_thread(self):
+        """
+        Background thread generating preview pages.
+        
+        Columns can be slow to generate (a pooled field builds its whole
+        pool first), so they are never generated on the main loop. Requests
+        that queue up meanwhile are skipped for the newest, which covers
+        them. Tk isn't thread-safe, so results go back with root.after.
+        """
+        while True:
+            request = self._preview_requests.get()
+            while not self._preview_requests.empty():
+                request = self._preview_requests.get_nowait()
+            fields, seed, limit, page = request
+            
+            if seed != self.preview.seed:
+                self.preview.reseed(seed)
+            self.preview.limit = limit
+            changed = self.preview.set_fields(fields)
+            try:
+                rows = self.preview.page(page) if fields else []
+            except Exception as e:
+                self.root.after(0, self._preview_failed, str(e))
+                continue
+            self.root.after(0, self._show_preview, request, changed, rows)
+        
+    def _show_preview(self, request, changed, rows):
+        """Put a page from the preview thread into the tree (runs on the Tk main loop)"""
+        fields, seed, limit, page = request
+        if tuple(field["name"] for field in fields) != self._preview_columns:
+            # The columns have changed since; a newer page is on its way
+            return
+        
+        tree = self.preview_tree
+        first = page * self.preview.page_size
+        if (seed, page) != self._preview_shown or len(tree.get_children()) != len(rows):
+            tree.delete(*tree.get_children())
+            for offset, row in enumerate(rows):
+                tree.insert("", tk.END, iid=str(first + offset), values=[format_value(value) for value in row])
+            if (seed, page) != self._preview_shown:
+                tree.yview_moveto(self._preview_scroll)
+        else:
+            # Same page as shown; only the regenerated columns differ
+            indexes = [self._preview_columns.index(name) for name in changed]
+            for offset, row in enumerate(rows):
+                for name, index in zip(changed, indexes):
+                    tree.set(str(first + offset), name, format_value(row[index]))
+        self._preview_shown = (seed, page)
+        
+        if rows:
+            self.preview_label_var.set(f"Rows {first + 1}-{first + len(rows)} (seed {seed})")
+        else:
+            self.preview_label_var.set("Add fields to see a preview")
+        
+    def _preview_failed(self, message):
+        """Report a preview that couldn't be generated (runs on the Tk main loop)"""
+        # Some columns may have been regenerated without being shown
+        self._preview_shown = None
+        self.preview_label_var.set(f"Preview unavailable: {message}")
+        
+    def _scroll_preview(self, direction):
+        """Turn the page when scrolling past the top or bottom of the current one"""
+        top, bottom = self.preview_tree.yview()
+        if direction > 0 and bottom >= 1.0:
+            self.show_preview_page(self.preview_page + 1)
+        elif direction < 0 and top <= 0.0 and self.preview_page > 0:
+            self.show_preview_page(self.preview_page - 1)
+            # Arrive at the bottom of the previous page
+            self._preview_scroll = 1
+        
+    def _reseed_preview(self):
+        """Follow the seed entry (or the session seed when it's empty)"""
+        seed = self.seed_var.get().strip()
+        try:
+            seed = int(seed) if seed else self.session_seed
+        except ValueError:
+            return
+        if seed != self.preview_seed:
+            self.preview_seed = seed
+            self._request_preview()
+        
+    def _resize_preview(self):
+        """Limit the preview to the number of records that will be generated"""
+        try:
+            num_records = int(self.num_records_var.get())
+        except ValueError:
+            return
+        if num_records > 0:
+            self.preview_limit = min(num_records, DEFAULT_CHUNK_SIZE)
+            self.show_preview_page(self.preview_page)
         
     def browse_output_file(self):
         """Open file dialog to select output file"""
-        format_ext = ".json" if self.export_format_var.get().lower() == "json" else ".csv"
+        format_ext = EXPORT_FORMATS.get(self.export_format_var.get(), ".json")
         
         filename = filedialog.asksaveasfilename(
             defaultextension=format_ext,
             filetypes=[
-                ("JSON files", "*.json"),
-                ("CSV files", "*.csv"),
-                ("All files", "*.*")
-            ]
+                (f"{name} files", f"*{ext}") for name, ext in EXPORT_FORMATS.items()
+            ] + [
+                (f"{name} compressed files", f"*{ext}") for name, ext in COMPRESSIONS.items()
+            ] + [("All files", "*.*")]
         )
         
         if filename:
@@ -281,99 +651,165 @@ class DataGeneratorApp:
             messagebox.showerror("Error", "Invalid number of records")
             return
             
+        seed = self.seed_var.get().strip()
+        if seed:
+            try:
+                seed = int(seed)
+            except ValueError:
+                messagebox.showerror("Error", "Seed must be a whole number")
+                return
+        else:
+            seed = None
+            
         export_format = self.export_format_var.get()
         output_file = self.output_file_var.get()
         
+        if export_format not in EXPORT_FORMATS:
+            messagebox.showerror("Error", f"Unsupported export format: {export_format}")
+            return
+        
         if not output_file:
             messagebox.showerror("Error", "Output file not specified")
             return
             
-        # Check if output file extension matches the selected format
-        expected_ext = ".json" if export_format.lower() == "json" else ".csv"
-        if not output_file.lower().endswith(expected_ext):
-            output_file += expected_ext
+        # Check if output file extension matches the selected format; a
+        # trailing .gz or .zst compresses the output
+        expected_ext = EXPORT_FORMATS[export_format]
+        base_file = strip_compression_suffix(output_file)
+        if not base_file.lower().endswith(expected_ext):
+            output_file = base_file + expected_ext + output_file[len(base_file):]
             self.output_file_var.set(output_file)
+        try:
+            output_compression(export_format, output_file)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
             
+        profile = GenerationProfile() if self.profile_var.get() else None
+        resume = self.resume_var.get()
+        if resume and not writer_class(export_format).appendable:
+            messagebox.showerror("Error", f"{export_format} exports can't be resumed")
+            return
+        
+        # Use the preview's seed so the output matches it, unless an
+        # interrupted run carries on with its own
+        if seed is None and not (resume and read_manifest(checkpoint_path(output_file))):
+            seed = self.session_seed
+        
         # Start generation in a separate thread
         self.is_generating = True
+        self.cancel_token = CancellationToken()
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.status_var.set("Generating data...")
+        self.progress_var.set(0)
         threading.Thread(target=self._generate_data_thread, args=(
-            self.fields, num_records, export_format, output_file
-        )).start()
-        
-    def _generate_data_thread(self, fields, num_records, export_format, output_file):
-        """Background thread for data generation"""
+            self.fields, num_records, export_format, output_file, seed, self.cancel_token, profile, resume
+        ), daemon=True).start()
+        
+    def cancel_generation(self):
+        """Ask the running generation to stop"""
+        if self.is_generating and self.cancel_token is not None:
+            self.cancel_token.cancel()
+            self.cancel_btn.config(state=tk.DISABLED)
+            self.status_var.set("Cancelling...")
+        
+    def _generate_data_thread(self, fields, num_records, export_format, output_file, seed, cancel_token,
+                              profile=None, resume=False):
+        """
+        Background thread for data generation.
+        
+        Tk isn't thread-safe, so every UI update is handed to the main loop
+        with root.after.
+        """
         try:
-            self.status_var.set("Generating data...")
-            self.progress_var.set(0)
-            
-            # Update progress periodically
-            def update_progress():
-                for i in range(1, 101):
-                    if not self.is_generating:
-                        break
-                    self.progress_var.set(i)
-                    time.sleep(0.01 * min(num_records / 100, 1))  # Scale with record count
-                    
-            progress_thread = threading.Thread(target=update_progress)
-            progress_thread.daemon = True
-            progress_thread.start()
-            
-            # Generate the data
-            records = generate_data(fields, num_records)
-            
-            # Export the data
-            if export_format.lower() == "json":
-                self._export_json(records, output_file)
+            if resume:
+                export_resumable(
+                    fields, num_records, output_file, export_format, seed=seed,
+                    progress=self._on_progress, cancel=cancel_token, profile=profile
+                )
             else:
-                self._export_csv(records, output_file)
-                
-            # Ensure progress bar reaches 100%
-            self.progress_var.set(100)
+                # Generate across worker processes and export chunk by chunk so
+                # memory stays flat; files are written by a background thread
+                # while the next chunk is generated
+                chunks = iter_parallel_chunks(fields, num_records, seed=seed, cancel=cancel_token, profile=profile)
+                export = export_records if export_format in DATABASE_FORMATS else export_pipelined
+                export(
+                    chunks, output_file, export_format, fields,
+                    total=num_records, progress=self._on_progress, cancel=cancel_token, profile=profile
+                )
             
             # Show success message
+            status = f"Generated {num_records} records successfully"
+            if profile is not None:
+                status += f" ({profile.summary()})"
+                self.root.after(0, self._show_profile, profile.report())
+            self.root.after(0, self._finish_generation, 100, status)
             self.root.after(0, lambda: messagebox.showinfo(
                 "Success", 
                 f"Generated {num_records} records and saved to:\n{output_file}"
             ))
-            self.status_var.set(f"Generated {num_records} records successfully")
             
-        except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to generate data: {str(e)}"))
-            self.status_var.set("Error generating data")
+        except GenerationCancelled:
+            status = "Generation cancelled (generate again to resume)" if resume else "Generation cancelled"
+            self.root.after(0, self._finish_generation, 0, status)
             
-        finally:
-            self.is_generating = False
-            
-    def _export_json(self, records, output_file):
-        """Export records to JSON format"""
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(records, f, indent=2, ensure_ascii=False, default=str)
+        except Exception as e:
+            message = f"Failed to generate data: {str(e)}"
+            self.root.after(0, self._finish_generation, 0, "Error generating data")
+            self.root.after(0, lambda: messagebox.showerror("Error", message))
             
-    def _export_csv(self, records, output_file):
-        """Export records to CSV format"""
-        if not records:
+    def _on_progress(self, progress):
+        """Progress callback, called from the generation thread after every chunk"""
+        # Throttle to ~10 updates a second so the event queue never floods
+        now = time.monotonic()
+        if now - self._last_progress_update < PROGRESS_UPDATE_INTERVAL and not progress.finished:
             return
-            
-        # Get all unique field names across all records
-        fieldnames = set()
-        for record in records:
-            fieldnames.update(record.keys())
-        fieldnames = sorted(list(fieldnames))
-        
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(records)
+        self._last_progress_update = now
+        self.root.after(0, self._show_progress, progress)
+        
+    def _show_progress(self, progress):
+        """Display a progress update (runs on the Tk main loop)"""
+        if not self.is_generating:
+            return
+        self.progress_var.set(100 * (progress.fraction or 0))
+        self.status_var.set(
+            f"Generated {progress.rows_done:,} of {progress.total:,} records "
+            f"({progress.rows_per_second:,.0f} rows/sec)"
+        )
+        
+    def _show_profile(self, report):
+        """Fill the profile panel from a profile report (runs on the Tk main loop)"""
+        if self.profile_frame is None:
+            self.create_profile_section()
+        
+        self.profile_tree.delete(*self.profile_tree.get_children())
+        for entry in report["fields"]:
+            self.profile_tree.insert("", tk.END, values=(
+                entry["name"], entry["type"], f"{entry['seconds']:.3f}", f"{entry['share']:.1%}"
+            ))
+        
+    def _finish_generation(self, percent, status):
+        """Reset the UI after a run ends (runs on the Tk main loop)"""
+        self.is_generating = False
+        self.cancel_token = None
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.progress_var.set(percent)
+        self.status_var.set(status)
             
     def show_about_dialog(self):
         """Show information about the application"""
+        formats = list(EXPORT_FORMATS)
         messagebox.showinfo(
             "About User Data Generator",
             "User Data Generator v1.0\n\n"
             "A tool for generating sample user data for testing and debugging.\n\n"
             "Features:\n"
             "- Generate customizable user data\n"
-            "- Export to JSON or CSV formats\n"
+            f"- Export to {', '.join(formats[:-1])} or {formats[-1]}\n"
             "- Define your own field structure\n\n"
             "© 2025 User Data Generator Team"
         )
+
+def format_params(params):
+    """Format field parameters for display, e.g. "min=1, max=100" """
+    return ", ".join(f"{name}={value}" for name, value in params.items())
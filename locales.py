@@ -0,0 +1,121 @@
+"""
+Locale weighting and the per-process cache of Faker instances.
+
+A locale setting is either a single Faker locale ("de_DE") or a weighting
+of several, so one dataset can mix e.g. German, Japanese and Brazilian
+records. Weightings can be written as:
+
+* a string: "de_DE:3,ja_JP,pt_BR:0.5" (a missing weight counts as 1)
+* a list of locales, weighted equally: ["de_DE", "ja_JP"]
+* a mapping of locales to weights: {"de_DE": 3, "ja_JP": 1}
+
+The string form is what `--locale` takes on the command line.
+
+Building a Faker instance means importing its locale's provider modules
+and binding every provider method, so instances are cached per locale and
+shared by the contexts of a process: a worker builds one instance per
+locale and reuses it for every shard and every later run. An instance is
+leased to one context at a time, since its random state belongs to that
+context; it goes back to the cache when the context is closed or garbage
+collected.
+"""
+
+import threading
+import weakref
+
+# Locale -> cached instances not leased to a context, as (Faker, loaded
+# provider names) pairs
+_free_instances = {}
+_lock = threading.Lock()
+
+def parse_locales(locale, what=None):
+    """
+    Parse a locale setting into (locale, weight) pairs.
+
+    Args:
+        locale: A locale, a weighting string, a list of locales or a
+            mapping of locales to weights; None for Faker's default
+        what (str): What the setting belongs to, e.g. "field 'name'", for
+            error messages
+
+    Returns:
+        tuple: (locale, weight) pairs, or None for Faker's default locale
+    """
+    if locale is None or locale == "":
+        return None
+    where = f" for {what}" if what else ""
+
+    if isinstance(locale, str):
+        pairs = []
+        for part in locale.split(","):
+            name, sep, weight = part.strip().partition(":")
+            if sep:
+                try:
+                    weight = float(weight)
+                except ValueError:
+                    raise ValueError(f"Invalid weight for locale {name}{where}: {weight}")
+            else:
+                weight = 1
+            pairs.append((name, weight))
+    elif isinstance(locale, dict):
+        pairs = list(locale.items())
+    elif isinstance(locale, (list, tuple)):
+        pairs = [(name, 1) for name in locale]
+    else:
+        raise ValueError(f"Invalid locale setting{where}: {locale!r}")
+
+    if not pairs:
+        raise ValueError(f"No locales given{where}")
+
+    from faker.config import AVAILABLE_LOCALES
+
+    seen = set()
+    result = []
+    for name, weight in pairs:
+        if not isinstance(name, str) or name.replace("-", "_") not in AVAILABLE_LOCALES:
+            raise ValueError(f"Unknown locale{where}: {name}")
+        name = name.replace("-", "_")
+        if name in seen:
+            raise ValueError(f"Locale {name} is listed twice{where}")
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not weight > 0:
+            raise ValueError(f"Weight for locale {name}{where} must be a positive number")
+        seen.add(name)
+        result.append((name, weight))
+    return tuple(result)
+
+def acquire_faker(locale, owner):
+    """
+    Lease a Faker instance for a locale to `owner`.
+
+    A cached instance is handed out if one is free, otherwise a new one is
+    built (with no providers loaded). Either way it goes back to the cache
+    once `owner` is garbage collected, or earlier when the returned
+    release function is called. The caller must reseed it, as it still
+    holds the previous owner's random state.
+
+    Args:
+        locale (str): Faker locale, or None for the default
+        owner: Object the instance is leased to
+
+    Returns:
+        tuple: (Faker instance, set of the provider names loaded into it,
+            release function); add to the set when loading more providers
+    """
+    with _lock:
+        free = _free_instances.get(locale)
+        instance = free.pop() if free else None
+
+    if instance is None:
+        from faker import Faker
+        # "faker.providers" on its own loads no providers; they are added
+        # per field type as they're needed
+        instance = (Faker(locale, providers=["faker.providers"]), set())
+
+    fake, providers = instance
+    # finalize objects run at most once, whichever comes first
+    return fake, providers, weakref.finalize(owner, _release, locale, instance)
+
+def _release(locale, instance):
+    """Return a leased instance to the cache"""
+    with _lock:
+        _free_instances.setdefault(locale, []).append(instance)
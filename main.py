@@ -4,21 +4,26 @@ User Data Generator - Main Entry Point
 
 This module serves as the entry point for the User Data Generator application.
 It initializes the GUI and handles dependency checking and error handling.
+
+Run with --headless to generate data from the command line instead (see
+cli.py), or with --serve to start the local HTTP service (see service.py);
+tkinter is never imported in either mode.
 """
 
-import tkinter as tk
 import sys
 import importlib.util
 import traceback
-from tkinter import messagebox
 
 # Define required dependencies
 REQUIRED_PACKAGES = ['faker']
 
-def check_dependencies():
+def check_dependencies(headless=False):
     """
     Check if all required packages are installed.
     
+    Args:
+        headless (bool): Report problems on stderr instead of in a dialog
+    
     Returns:
         bool: True if all dependencies are met, False otherwise
     """
@@ -35,18 +40,54 @@ def check_dependencies():
             "Please install them using pip:\n"
             f"pip install {' '.join(missing_packages)}"
         )
-        messagebox.showerror("Dependency Error", error_message)
+        if headless:
+            print(error_message, file=sys.stderr)
+        else:
+            from tkinter import messagebox
+            messagebox.showerror("Dependency Error", error_message)
         return False
     
     return True
 
-def main():
+def main(argv=None):
     """
     Main function to initialize and run the application.
     
+    Args:
+        argv (list): Command line arguments, defaults to sys.argv[1:]
+    
+    Returns:
+        int: Exit code (0 for success, non-zero for errors)
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if "--headless" in argv:
+        if not check_dependencies(headless=True):
+            return 1
+        
+        import cli
+        return cli.main([arg for arg in argv if arg != "--headless"])
+    
+    if "--serve" in argv:
+        if not check_dependencies(headless=True):
+            return 1
+        
+        import service
+        return service.main([arg for arg in argv if arg != "--serve"])
+    
+    return run_gui()
+
+def run_gui():
+    """
+    Start the Tk application.
+    
     Returns:
         int: Exit code (0 for success, non-zero for errors)
     """
+    import tkinter as tk
+    from tkinter import messagebox
+    
     # Check dependencies before importing application modules
     if not check_dependencies():
         return 1
@@ -55,17 +96,16 @@ def main():
         # Import the GUI module (only import after dependency check)
         from gui import DataGeneratorApp
         
-        # Create and configure the root window
-        root = tk.Tk()
-        root.title("User Data Generator")
-        
-        # Apply a theme if available
-        try:
+        # Create the root window, themed if ttkthemes is available. Only
+        # one Tk instance is created: each one starts its own Tcl
+        # interpreter, and a discarded one would leave a stray window.
+        if importlib.util.find_spec("ttkthemes") is not None:
             from ttkthemes import ThemedTk
-            root = ThemedTk(theme="arc")  # Use a modern theme if available
-        except ImportError:
+            root = ThemedTk(theme="arc")  # Loads only the theme it uses
+        else:
             # ttkthemes is optional, continue with default theme
-            pass
+            root = tk.Tk()
+        root.title("User Data Generator")
         
         # Create the application instance
         app = DataGeneratorApp(root)
@@ -75,6 +115,9 @@ def main():
         
         # File menu
         file_menu = tk.Menu(menu_bar, tearoff=0)
+        file_menu.add_command(label="Open Schema...", command=app.open_schema)
+        file_menu.add_command(label="Save Schema...", command=app.save_schema)
+        file_menu.add_separator()
         file_menu.add_command(label="Exit", command=root.quit)
         menu_bar.add_cascade(label="File", menu=file_menu)
         
@@ -0,0 +1,287 @@
+"""
+Multi-process generation engine.
+
+Generation is CPU-bound inside Faker, so threads don't help. This module
+splits a run into fixed-size shards, generates them in a pool of worker
+processes and yields the shards back in order.
+
+Each shard is seeded from the run's master seed and its shard index, and
+shard boundaries depend only on `shard_size`, so a given seed produces the
+same records whatever the number of workers.
+"""
+
+import itertools
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+
+from batches import RecordBatch
+from data_generator import (
+    CompiledSchema, GenerationCancelled, GeneratorContext, compile_schema, track_progress, validate_fields,
+)
+from locales import parse_locales
+from profiling import GenerationProfile
+from uniqueness import UniqueTracker
+
+# Number of records generated by one worker task
+DEFAULT_SHARD_SIZE = 10000
+
+# Seconds between cancellation checks while waiting on a worker
+CANCEL_POLL_INTERVAL = 0.1
+
+# Context of the run a worker process is currently serving, keyed by
+# (seed, locale weights); it's reused for every shard of the run
+_worker_context = {}
+
+def plan_shards(count, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Split a record count into shards.
+
+    Args:
+        count (int): Total number of records
+        shard_size (int): Maximum number of records per shard
+
+    Returns:
+        list: List of (shard_index, shard_count) tuples
+    """
+    return [
+        (index, min(shard_size, count - start))
+        for index, start in enumerate(range(0, count, shard_size))
+    ]
+
+def _get_worker_context(seed, locale):
+    """Return the worker's GeneratorContext for a run, creating it once"""
+    key = (seed, parse_locales(locale))
+    if key not in _worker_context:
+        # Hand the previous run's Faker instances on to this one
+        for context in _worker_context.values():
+            context.close()
+        _worker_context.clear()
+        _worker_context[key] = GeneratorContext(seed=seed, locale=locale)
+    return _worker_context[key]
+
+def generate_shard(fields, shard_index, count, master_seed, locale=None, profile=False):
+    """
+    Generate one shard of records.
+
+    Runs in a worker process, whose own GeneratorContext is reseeded from
+    the master seed and shard index, exactly as a serial run reseeds chunk
+    `shard_index`.
+
+    Args:
+        fields (list): Field definitions
+        shard_index (int): Index of the shard within the run
+        count (int): Number of records in the shard
+        master_seed (int): Seed of the whole run
+        locale (str): Faker locale
+        profile (bool): Profile the shard and return the report with it
+
+    Returns:
+        list: The shard's records, or a (records, profile report) tuple
+            when profiling
+    """
+    context = _get_worker_context(master_seed, locale)
+    context.seed_chunk(shard_index)
+    if not profile:
+        return compile_schema(fields, context).build_rows(count)
+
+    shard_profile = GenerationProfile()
+    records = compile_schema(fields, context, shard_profile).build_rows(count)
+    return records, shard_profile.report()
+
+def iter_parallel_chunks(fields, count, seed=None, workers=None, shard_size=DEFAULT_SHARD_SIZE,
+                         locale=None, progress=None, cancel=None, profile=None, start_shard=0):
+    """
+    Generate records across worker processes, yielding one shard at a time.
+
+    Only a bounded number of shards are in flight at once, so memory stays
+    flat for large runs. With one worker (or a single shard) everything runs
+    in the calling process.
+
+    Cancelling stops handing out shards and returns without waiting for the
+    shards still running; their workers exit once they finish.
+
+    Args:
+        fields (list): List of dictionaries with 'name' and 'type' keys
+        count (int): Number of records to generate
+        seed (int): Master seed; a random one is chosen if omitted
+        workers (int): Number of worker processes, defaults to the CPU count
+        shard_size (int): Number of records per shard
+        locale (str): Faker locale, or a weighting of several (see locales.py)
+        progress (callable): Called with a data_generator.Progress after
+            every shard
+        cancel (CancellationToken): Token to stop the run early; the
+            iterator then raises GenerationCancelled
+        profile (profiling.GenerationProfile): Profile to merge the
+            workers' field and provider timings into; the generation phase
+            is the time spent waiting on workers
+        start_shard (int): Index of the first shard to produce, to resume a
+            run; schemas with unique fields regenerate the skipped shards
+            (without yielding them) to rebuild their seen values
+
+    Returns:
+        iterator: Iterator over lists of records, in order
+    """
+    # Only validated here; the workers compile the fields (and build any
+    # pools) themselves
+    if isinstance(fields, CompiledSchema):
+        fields = fields.fields
+    validate_fields(fields)
+    fields = [dict(field) for field in fields]
+
+    if count <= 0:
+        raise ValueError("Record count must be a positive number")
+
+    if shard_size <= 0:
+        raise ValueError("Shard size must be a positive number")
+
+    if start_shard < 0:
+        raise ValueError("Start shard must not be negative")
+
+    # Fail on bad locales before any worker starts
+    parse_locales(locale)
+
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+
+    shards = plan_shards(count, shard_size)
+    resumed = shards[start_shard:]
+    remaining = sum(shard_count for _, shard_count in resumed)
+    tracker = UniqueTracker.for_fields(fields)
+    if tracker is None:
+        shards = resumed
+
+    workers = min(workers or os.cpu_count() or 1, max(len(shards), 1))
+    chunks = _run_shards(fields, shards, seed, workers, locale, cancel, profile)
+
+    # Unique fields are made unique across shards here, in shard order
+    if tracker is not None:
+        chunks = itertools.islice(map(tracker.apply, chunks), start_shard, None)
+    return track_progress(chunks, remaining, progress, cancel)
+
+def generate_parallel(fields, count, seed=None, workers=None, shard_size=DEFAULT_SHARD_SIZE,
+                      locale=None, batch=False):
+    """
+    Generate records across worker processes.
+
+    Args:
+        fields (list): List of dictionaries with 'name' and 'type' keys
+        count (int): Number of records to generate
+        seed (int): Master seed; a random one is chosen if omitted
+        workers (int): Number of worker processes, defaults to the CPU count
+        shard_size (int): Number of records per shard
+        locale (str): Faker locale
+        batch (bool): Return a batches.RecordBatch; each shard is packed
+            into it as it arrives
+
+    Returns:
+        list: List of dictionaries containing the generated data, or a
+            RecordBatch of them
+    """
+    chunks = iter_parallel_chunks(fields, count, seed, workers, shard_size, locale)
+    if batch:
+        return RecordBatch.from_chunks(chunks, fields)
+    return [record for chunk in chunks for record in chunk]
+
+def _run_shards(fields, shards, seed, workers, locale, cancel, profile=None):
+    """Generator backing iter_parallel_chunks"""
+    try:
+        if workers <= 1:
+            for shard_index, shard_count in shards:
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                start = time.perf_counter()
+                result = generate_shard(fields, shard_index, shard_count, seed, locale, profile is not None)
+                yield _collect_shard(result, profile, start)
+            return
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+        task = partial(generate_shard, fields, master_seed=seed, locale=locale, profile=profile is not None)
+        # Keep every worker busy with one shard queued behind it
+        futures = dispatch_shards(executor, shards, task, workers * 2)
+        finished = False
+
+        try:
+            for _, future in futures:
+                start = time.perf_counter()
+                yield _collect_shard(_wait_for_shard(future, cancel), profile, start)
+
+            finished = True
+
+        finally:
+            # If the run is cancelled or the consumer stops early, drop the
+            # queued shards and return without waiting for running ones
+            futures.close()
+            executor.shutdown(wait=finished)
+
+    except GenerationCancelled:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"Error generating data: {str(e)}")
+
+def dispatch_shards(executor, shards, task, in_flight):
+    """
+    Run shards on an executor, yielding their futures in shard order.
+
+    Only `in_flight` shards are submitted at a time; the next one is
+    submitted as each future is handed out, so memory stays flat however
+    many shards a run has. Closing the generator (e.g. when the consumer
+    stops early) cancels the shards that haven't started.
+
+    Args:
+        executor (concurrent.futures.Executor): Executor to run the shards on
+        shards (iterable): (shard_index, shard_count) tuples, in order
+        task (callable): Picklable function, run as
+            `task(shard_index, shard_count)`
+        in_flight (int): Number of shards to keep submitted
+
+    Yields:
+        tuple: (shard_index, Future of the task's result)
+    """
+    remaining = iter(shards)
+    pending = deque()
+
+    def submit_next():
+        shard = next(remaining, None)
+        if shard is not None:
+            pending.append((shard[0], executor.submit(task, *shard)))
+
+    try:
+        for _ in range(in_flight):
+            submit_next()
+
+        while pending:
+            shard = pending.popleft()
+            submit_next()
+            yield shard
+
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+def _collect_shard(result, profile, start):
+    """Unpack a shard result, merging its profile report into the run's"""
+    if profile is None:
+        return result
+
+    records, report = result
+    profile.merge(report)
+    profile.add_phase("generation", time.perf_counter() - start, len(records))
+    profile.add_rows(len(records))
+    return records
+
+def _wait_for_shard(future, cancel):
+    """Wait for a shard's result, checking the cancellation token while waiting"""
+    if cancel is None:
+        return future.result()
+
+    while True:
+        cancel.raise_if_cancelled()
+        try:
+            return future.result(timeout=CANCEL_POLL_INTERVAL)
+        except FutureTimeoutError:
+            pass
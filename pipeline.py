@@ -0,0 +1,366 @@
+"""
+Pipelined export: overlap generation, encoding, compression and disk writes.
+
+A plain export does everything in one thread: it waits for a chunk, encodes
+it, then blocks on the disk before asking for the next chunk. The pipeline
+splits that into stages connected by bounded queues:
+
+    generate -> encode -> [queue] -> compress -> [queue] -> write
+
+Chunks are generated (by worker processes, see `parallel`) and encoded by
+the format's writer in the calling thread. The encoded bytes are handed to
+an optional compression stage (see `compression`, which spreads the work
+over its own threads) and a dedicated writer thread. zlib, zstd and file
+writes release the GIL, so compression and I/O run while the next chunk
+is encoded. The queues hold at most `queue_size` encoded chunks each:
+when the disk falls behind, encoding blocks (backpressure) instead of
+buffering the whole run in memory.
+
+A PipelineStats passed in records how busy each stage was and its
+throughput, which shows whether a run is bound by generation, encoding,
+compression or the disk.
+"""
+
+import os
+import queue
+import threading
+import time
+
+from compression import compressor
+from data_generator import GenerationCancelled, track_progress
+from exporters import WRITE_BUFFER_SIZE, open_writer, output_compression
+
+# Encoded chunks buffered between two stages
+DEFAULT_QUEUE_SIZE = 4
+
+# Seconds between checks for a failed stage while blocked on a queue
+POLL_INTERVAL = 0.1
+
+# Marks the end of the stream in a queue
+_DONE = object()
+
+class StageStats:
+    """Work done by one pipeline stage"""
+
+    __slots__ = ("rows", "bytes", "seconds", "waited")
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.waited = 0.0
+
+    @property
+    def rows_per_second(self):
+        """Rows handled per busy second"""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self):
+        """Bytes produced per busy second"""
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+class PipelineStats:
+    """
+    Per-stage timings of a pipelined export.
+
+    `seconds` is the time a stage spent working and `waited` the time it
+    spent blocked on a full queue downstream; a stage that waits a lot is
+    not the bottleneck. `bytes` is what the stage produced, so comparing
+    the encode and compress stages gives the compression ratio.
+    """
+
+    STAGES = ("generate", "encode", "compress", "write")
+
+    def __init__(self):
+        self.stages = {name: StageStats() for name in self.STAGES}
+        self.elapsed = 0.0
+
+    def report(self):
+        """
+        Build a report of the stages that ran.
+
+        Returns:
+            dict: "elapsed" and a "stages" list with rows, bytes, seconds,
+                waited and throughput per stage
+        """
+        return {
+            "elapsed": self.elapsed,
+            "stages": [
+                {
+                    "stage": name,
+                    "rows": stats.rows,
+                    "bytes": stats.bytes,
+                    "seconds": stats.seconds,
+                    "waited": stats.waited,
+                    "rows_per_second": stats.rows_per_second,
+                    "bytes_per_second": stats.bytes_per_second,
+                }
+                for name, stats in self.stages.items()
+                if stats.seconds or stats.bytes or stats.rows
+            ],
+        }
+
+    def summary(self):
+        """One-line summary of each stage's throughput"""
+        parts = []
+        for entry in self.report()["stages"]:
+            if entry["stage"] in ("generate", "encode"):
+                rate = f"{entry['rows_per_second']:,.0f} rows/s"
+            else:
+                rate = f"{entry['bytes_per_second'] / 1e6:,.1f} MB/s"
+            parts.append(f"{entry['stage']} {rate}")
+        return ", ".join(parts)
+
+class ExportPipeline:
+    """
+    Binary stream that hands writes to background compression and writer threads.
+
+    Give it to a RecordWriter in place of the file: each `write` is queued
+    and returns as soon as there is room in the queue. `close` waits for
+    everything to reach the underlying stream (which is left open) and
+    raises any error from the background threads; `abort` stops them
+    without finishing the output. Used as a context manager, it closes on
+    success and aborts on an exception.
+    """
+
+    def __init__(self, stream, queue_size=DEFAULT_QUEUE_SIZE, compress=None, compress_level=None,
+                 stats=None):
+        if queue_size <= 0:
+            raise ValueError("Queue size must be a positive number")
+
+        self.stream = stream
+        self.stats = stats or PipelineStats()
+        self._failed = threading.Event()
+        self._error = None
+        self._inbox = queue.Queue(queue_size)
+        self._threads = []
+        self._closed = False
+        self._position = 0
+
+        write_queue = self._inbox
+        if compress is not None:
+            write_queue = queue.Queue(queue_size)
+            self._start(self._compress, self._inbox, write_queue,
+                        compressor(compress, compress_level))
+        self._start(self._write, write_queue)
+
+    def write(self, data):
+        """Queue encoded bytes, blocking while the pipeline is full"""
+        if data:
+            self._position += len(data)
+            self.stats.stages["encode"].bytes += len(data)
+            self._send(data)
+        return len(data)
+
+    def flush(self):
+        """Writes are flushed as the writer thread drains the queue"""
+        pass
+
+    # Enough of the file interface for pyarrow's writers
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        """Bytes written to the pipeline so far (before compression)"""
+        return self._position
+
+    def close(self):
+        """Finish the output and wait for it to be written"""
+        self._closed = True
+        self._send(_DONE)
+        self._join()
+        if self._error is not None:
+            raise self._error
+
+    def abort(self):
+        """Stop the background threads, dropping anything still queued"""
+        self._closed = True
+        self._failed.set()
+        self._join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def _send(self, item):
+        """Queue an item from the encoding thread, raising a failed stage's error"""
+        try:
+            self._put(self._inbox, item, self.stats.stages["encode"])
+        except _Aborted:
+            self._join()
+            raise self._error or RuntimeError("Export pipeline was aborted")
+
+    def _start(self, target, *args):
+        thread = threading.Thread(target=self._run, args=(target,) + args, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _run(self, target, *args):
+        try:
+            target(*args)
+        except _Aborted:
+            pass
+        except BaseException as e:
+            self._error = e
+            self._failed.set()
+
+    def _join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def _compress(self, inbox, outbox, compressobj):
+        stats = self.stats.stages["compress"]
+        clock = time.perf_counter
+        while True:
+            data = self._get(inbox)
+            done = data is _DONE
+            start = clock()
+            data = compressobj.flush() if done else compressobj.compress(data)
+            stats.seconds += clock() - start
+            if data:
+                stats.bytes += len(data)
+                self._put(outbox, data, stats)
+            if done:
+                self._put(outbox, _DONE, stats)
+                return
+
+    def _write(self, inbox):
+        stats = self.stats.stages["write"]
+        clock = time.perf_counter
+        while True:
+            data = self._get(inbox)
+            start = clock()
+            if data is _DONE:
+                self.stream.flush()
+                stats.seconds += clock() - start
+                return
+            self.stream.write(data)
+            # Hand data on straight away when piping, once caught up
+            if inbox.empty():
+                self.stream.flush()
+            stats.seconds += clock() - start
+            stats.bytes += len(data)
+
+    def _put(self, outbox, item, stats):
+        """Put an item on a queue, giving up if another stage has failed"""
+        start = time.perf_counter()
+        while True:
+            if self._failed.is_set():
+                raise _Aborted()
+            try:
+                outbox.put(item, timeout=POLL_INTERVAL)
+                break
+            except queue.Full:
+                continue
+        stats.waited += time.perf_counter() - start
+
+    def _get(self, inbox):
+        """Take an item from a queue, giving up if another stage has failed"""
+        while True:
+            if self._failed.is_set():
+                raise _Aborted()
+            try:
+                return inbox.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+class _Aborted(Exception):
+    """Raised in a stage when another stage has failed or the run was aborted"""
+
+def write_pipelined(chunks, stream, export_format, fields=None, total=None, progress=None,
+                    cancel=None, profile=None, stats=None, queue_size=DEFAULT_QUEUE_SIZE,
+                    compress=None, compress_level=None, **options):
+    """
+    Encode chunks of records into an open binary stream through the pipeline.
+
+    Args:
+        chunks (iterable): Iterable of lists of record dictionaries
+        stream: Binary stream to write to; left open
+        export_format (str): One of the keys in exporters.EXPORT_FORMATS
+            (except the database formats)
+        fields (list): Field definitions; required by the columnar formats
+        total (int): Expected number of records, for progress reporting
+        progress (callable): Called with a data_generator.Progress after
+            every chunk is encoded
+        cancel (CancellationToken): Token to stop the export early
+        profile (profiling.GenerationProfile): Profile to record the
+            encoding time into, as the "export" phase
+        stats (PipelineStats): Stats to record each stage's work into
+        queue_size (int): Encoded chunks buffered between stages
+        compress (str): "gzip" or "zstd" to compress the output
+        compress_level (int): Compression level
+        **options: Format specific writer options
+
+    Returns:
+        int: Number of records written
+    """
+    compress = output_compression(export_format, compress=compress)
+    stats = stats or PipelineStats()
+    generate = stats.stages["generate"]
+    encode = stats.stages["encode"]
+    clock = time.perf_counter
+    run_start = clock()
+
+    chunks = iter(track_progress(chunks, total, progress, cancel))
+    with ExportPipeline(stream, queue_size, compress, compress_level, stats) as pipe:
+        with open_writer(pipe, export_format, fields, **options) as writer:
+            while True:
+                start = clock()
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                generate.seconds += clock() - start
+                generate.rows += len(chunk)
+
+                start = clock()
+                waited = encode.waited
+                writer.write_chunk(chunk)
+                seconds = clock() - start - (encode.waited - waited)
+                encode.seconds += seconds
+                encode.rows += len(chunk)
+                if profile is not None:
+                    profile.add_phase("export", seconds, len(chunk))
+
+    stats.elapsed = clock() - run_start
+    return writer.records_written
+
+def export_pipelined(chunks, output_file, export_format, fields=None, total=None, progress=None,
+                     cancel=None, profile=None, stats=None, queue_size=DEFAULT_QUEUE_SIZE,
+                     compress=None, compress_level=None, **options):
+    """
+    Stream chunks of records into a file through the pipeline.
+
+    Takes the same arguments as `write_pipelined`, with the path of the
+    file to write in place of the stream. Unless `compress` is given, the
+    output is compressed if the file name ends in ".gz" or ".zst". If the
+    run is cancelled the partially written file is removed and
+    GenerationCancelled is raised.
+
+    Returns:
+        int: Number of records written
+    """
+    # Fails on unknown formats before creating the file
+    compress = output_compression(export_format, output_file, compress)
+    f = open(output_file, 'wb', buffering=WRITE_BUFFER_SIZE)
+
+    try:
+        with f:
+            return write_pipelined(
+                chunks, f, export_format, fields, total, progress, cancel, profile, stats,
+                queue_size, compress, compress_level, **options
+            )
+    except GenerationCancelled:
+        os.remove(output_file)
+        raise
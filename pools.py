@@ -0,0 +1,129 @@
+"""
+Pre-sampled value pools for expensive field types.
+
+Faker providers such as "Address" or "Company" cost far more per value
+than the rest of generation. When a field doesn't need every value to be
+unique, it can set `"pool": N` in its definition: N distinct values are
+generated once per run and rows are then drawn from the pool with a fast
+index sampler. N also sets the field's cardinality, which is useful for
+matching realistic distinct-value counts when testing database indexes.
+
+Pools for seeded runs can be cached on disk, keyed by field type, locale,
+seed and size. Set the DATA_GENERATOR_POOL_CACHE environment variable to a
+directory to enable the cache.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+# Directory for cached pools, or None to disable the disk cache
+POOL_CACHE_DIR = os.environ.get("DATA_GENERATOR_POOL_CACHE") or None
+
+# How many values to try per requested distinct value before giving up on
+# types that can't produce that many (e.g. a pool of 10 booleans)
+ATTEMPTS_PER_VALUE = 10
+
+class ValuePool:
+    """A fixed list of distinct values that rows are sampled from"""
+
+    def __init__(self, values):
+        if not values:
+            raise ValueError("A value pool needs at least one value")
+        self.values = values
+        self._array = None
+
+    def __len__(self):
+        return len(self.values)
+
+    def sampler(self, context):
+        """Return a zero-argument function drawing one value using the context's random state"""
+        values = self.values
+        rng = context.random
+        return lambda: rng.choice(values)
+
+    def column(self, context):
+        """Return a column function drawing `count` values using the context's random state"""
+        values = self.values
+        if not context.vectorize:
+            rng = context.random
+            return lambda count: rng.choices(values, k=count)
+
+        if self._array is None:
+            import numpy as np
+            self._array = np.empty(len(values), dtype=object)
+            self._array[:] = values
+        array = self._array
+        size = len(values)
+        return lambda count: array[context.numpy_random.integers(0, size, size=count)].tolist()
+
+def build_pool_values(generate, size):
+    """
+    Generate up to `size` distinct values.
+
+    Args:
+        generate (callable): Zero-argument value generator
+        size (int): Number of distinct values wanted
+
+    Returns:
+        list: The distinct values, in generation order; fewer than `size`
+            if the generator can't produce that many
+    """
+    values = []
+    seen = set()
+    for _ in range(size * ATTEMPTS_PER_VALUE):
+        value = generate()
+        key = _hashable(value)
+        if key not in seen:
+            seen.add(key)
+            values.append(value)
+            if len(values) == size:
+                break
+    return values
+
+def load_pool(spec, generate, size, cache_dir=None):
+    """
+    Load a pool from the disk cache, or build it (and cache it).
+
+    Args:
+        spec (dict): JSON-serializable description of the pool (field type,
+            locale, seed, ...) used as the cache key, or None to skip the cache
+        generate (callable): Zero-argument value generator
+        size (int): Number of distinct values wanted
+        cache_dir (str): Cache directory, defaults to POOL_CACHE_DIR
+
+    Returns:
+        ValuePool: The pool
+    """
+    if cache_dir is None:
+        cache_dir = POOL_CACHE_DIR
+
+    if spec is None or cache_dir is None:
+        return ValuePool(build_pool_values(generate, size))
+
+    key = hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:20]
+    path = os.path.join(cache_dir, f"pool-{key}.json")
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            return ValuePool(json.load(f))
+    except (OSError, ValueError):
+        pass
+
+    values = build_pool_values(generate, size)
+
+    # Write atomically so concurrent workers never read a partial file
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(values, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+    return ValuePool(values)
+
+def _hashable(value):
+    """Return a hashable key for a generated value"""
+    if isinstance(value, dict):
+        return json.dumps(value, sort_keys=True)
+    return value
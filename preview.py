@@ -0,0 +1,130 @@
+"""
+Live preview of a schema.
+
+A PreviewSample produces the first rows of a seeded run on demand, one
+page at a time, without running a generation. Seeded runs reseed every
+column from the chunk seed and the field's name (see
+GeneratorContext.seed_column), so:
+
+* the preview's rows are exactly the first rows of an export with the
+  same seed, whatever the record count or number of workers
+* a column only depends on its own field, so after the field list
+  changes only the columns of added or edited fields are regenerated
+
+Columns are generated lazily, only as far as the pages that have been
+shown, and cached per field definition. The preview covers the first
+chunk of a run. Unique fields match the export except for the rare
+values that had to be regenerated or suffixed as duplicates.
+
+Generating a column can take a while (a pooled field builds its whole
+pool first), so the GUI keeps its PreviewSample on a background thread.
+A sample isn't thread-safe; use it from one thread at a time.
+"""
+
+import json
+import math
+
+from data_generator import DEFAULT_CHUNK_SIZE, GeneratorContext, compile_schema
+
+# Rows shown per page
+PAGE_SIZE = 50
+
+class PreviewSample:
+    """
+    The first rows of a seeded run, generated a column and a page at a time.
+
+    Args:
+        seed (int): Seed of the run being previewed
+        locale (str): Faker locale
+        page_size (int): Rows per page
+        limit (int): Number of rows that can be previewed, at most one chunk
+    """
+
+    def __init__(self, seed, locale=None, page_size=PAGE_SIZE, limit=DEFAULT_CHUNK_SIZE):
+        if page_size <= 0:
+            raise ValueError("Page size must be a positive number")
+
+        self.locale = locale
+        self.page_size = page_size
+        self.limit = min(limit, DEFAULT_CHUNK_SIZE)
+        self.fields = []
+        self._columns = {}
+        self.context = None
+        self.reseed(seed)
+
+    @property
+    def page_count(self):
+        """Number of pages in the preview"""
+        return count_pages(self.limit, self.page_size)
+
+    def reseed(self, seed):
+        """Preview a different seed, dropping every generated column"""
+        self.seed = seed
+        if self.context is not None:
+            self.context.close()
+        self.context = GeneratorContext(seed=seed, locale=self.locale)
+        self.context.seed_chunk(0)
+        self._columns.clear()
+
+    def set_fields(self, fields):
+        """
+        Switch to a new field list.
+
+        Columns of fields that are unchanged are kept; the rest are
+        generated when a page is next requested.
+
+        Args:
+            fields (list): Field definitions
+
+        Returns:
+            list: Names of the fields whose columns changed
+        """
+        self.fields = [dict(field) for field in fields]
+        keys = {_field_key(field) for field in self.fields}
+        for key in list(self._columns):
+            if key not in keys:
+                del self._columns[key]
+        return [field["name"] for field in self.fields if _field_key(field) not in self._columns]
+
+    def page(self, number):
+        """
+        Rows of a page.
+
+        Args:
+            number (int): Page number, from 0
+
+        Returns:
+            list: One tuple of values per row, in field order
+        """
+        start = number * self.page_size
+        end = min(start + self.page_size, self.limit)
+        if start >= end:
+            return []
+        columns = [self._column(field, end)[start:end] for field in self.fields]
+        return list(zip(*columns))
+
+    def _column(self, field, rows):
+        """Values of a field's column, generated to at least `rows` rows"""
+        key = _field_key(field)
+        values = self._columns.get(key)
+        if values is None or len(values) < rows:
+            # A column's first rows don't depend on how many are generated,
+            # so generate ahead to keep paging forward cheap
+            count = min(max(rows, 2 * len(values or ())), self.limit)
+            values = compile_schema([field], self.context).build_column(0, count)
+            self._columns[key] = values
+        return values
+
+def count_pages(limit, page_size=PAGE_SIZE):
+    """Number of pages needed to preview `limit` rows"""
+    return max(math.ceil(limit / page_size), 1)
+
+def _field_key(field):
+    """Cache key for a field definition"""
+    return json.dumps(field, sort_keys=True)
+
+def format_value(value):
+    """Format a generated value for display in the preview"""
+    if isinstance(value, dict):
+        return " / ".join(str(part) for part in value.values())
+    return str(value)
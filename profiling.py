@@ -0,0 +1,198 @@
+"""
+Opt-in profiling of generation runs.
+
+A GenerationProfile passed to the generation and export functions records
+where a run spends its time:
+
+* per field: rows generated and seconds spent producing its column
+* per Faker provider method: calls and seconds, e.g. "person.name"
+* per phase: seconds spent generating chunks versus writing them out
+
+Profiling wraps every Faker call with a timer, so it slows generation down
+somewhat and is off unless a profile is passed in. Parallel runs profile
+each shard in its worker and merge the results, so field and provider
+seconds are summed over all workers and can exceed the run's wall time.
+"""
+
+import time
+
+class TimingStats:
+    """Cumulative call count and time for one field, provider or phase"""
+
+    __slots__ = ("calls", "seconds")
+
+    def __init__(self, calls=0, seconds=0.0):
+        self.calls = calls
+        self.seconds = seconds
+
+    def add(self, calls, seconds):
+        self.calls += calls
+        self.seconds += seconds
+
+class GenerationProfile:
+    """
+    Collects timings for a generation run.
+
+    A profile is not thread-safe; each generating thread or worker process
+    records into its own profile, and parallel runs merge the worker
+    reports with `merge`.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.field_types = {}
+        self.providers = {}
+        self.phases = {"generation": TimingStats(), "export": TimingStats()}
+        self.rows = 0
+
+    def time_column(self, field_name, field_type, column):
+        """
+        Wrap a column function so its calls are recorded against a field.
+
+        Args:
+            field_name (str): Name of the field
+            field_type (str): Type of the field
+            column (callable): Column function taking a row count
+
+        Returns:
+            callable: The timed column function
+        """
+        stats = self.fields.setdefault(field_name, TimingStats())
+        self.field_types[field_name] = field_type
+        clock = time.perf_counter
+
+        def timed(count):
+            start = clock()
+            values = column(count)
+            stats.add(count, clock() - start)
+            return values
+
+        return timed
+
+    def wrap_faker(self, fake):
+        """Return a stand-in for a Faker instance that times every provider call"""
+        return _ProfiledFaker(fake, self)
+
+    def time_provider(self, method, name):
+        """Wrap a bound Faker provider method so its calls are recorded"""
+        stats = self.providers.setdefault(_provider_key(method, name), TimingStats())
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stats.add(1, clock() - start)
+
+        return timed
+
+    def add_phase(self, phase, seconds, rows=0):
+        """Record `seconds` spent in a phase ("generation" or "export")"""
+        self.phases.setdefault(phase, TimingStats()).add(rows, seconds)
+
+    def add_rows(self, rows):
+        """Count rows produced by the run"""
+        self.rows += rows
+
+    def merge(self, report):
+        """
+        Add the field and provider timings of another profile's report.
+
+        Phases and row counts are left alone; the process merging the
+        reports measures those itself.
+
+        Args:
+            report (dict): Result of `report()` on another profile
+        """
+        for entry in report["fields"]:
+            name = entry["name"]
+            self.fields.setdefault(name, TimingStats()).add(entry["rows"], entry["seconds"])
+            self.field_types[name] = entry["type"]
+        for entry in report["providers"]:
+            self.providers.setdefault(entry["provider"], TimingStats()).add(entry["calls"], entry["seconds"])
+
+    def report(self):
+        """
+        Build a structured report of the run.
+
+        Fields and providers are sorted slowest first; each field's `share`
+        is its fraction of the total time spent producing columns.
+
+        Returns:
+            dict: Report with "rows", "phases", "fields" and "providers"
+        """
+        field_seconds = sum(stats.seconds for stats in self.fields.values())
+        fields = [
+            {
+                "name": name,
+                "type": self.field_types.get(name),
+                "rows": stats.calls,
+                "seconds": stats.seconds,
+                "share": stats.seconds / field_seconds if field_seconds else 0.0,
+            }
+            for name, stats in self.fields.items()
+        ]
+        providers = [
+            {"provider": key, "calls": stats.calls, "seconds": stats.seconds}
+            for key, stats in self.providers.items()
+            if stats.calls
+        ]
+        fields.sort(key=lambda entry: entry["seconds"], reverse=True)
+        providers.sort(key=lambda entry: entry["seconds"], reverse=True)
+
+        return {
+            "rows": self.rows,
+            "phases": {phase: stats.seconds for phase, stats in self.phases.items()},
+            "fields": fields,
+            "providers": providers,
+        }
+
+    def summary(self, limit=3):
+        """
+        One-line summary for status bars: phase times and the slowest fields.
+
+        Args:
+            limit (int): Number of fields to name
+
+        Returns:
+            str: The summary
+        """
+        report = self.report()
+        phases = report["phases"]
+        text = f"generation {phases['generation']:.2f}s, export {phases['export']:.2f}s"
+        slowest = [
+            f"{entry['name']} {entry['share']:.0%}"
+            for entry in report["fields"][:limit]
+        ]
+        if slowest:
+            text += "; slowest fields: " + ", ".join(slowest)
+        return text
+
+class _ProfiledFaker:
+    """Proxy for a Faker instance whose callable attributes are timed"""
+
+    def __init__(self, fake, profile):
+        self._fake = fake
+        self._profile = profile
+        self._methods = {}
+
+    def __getattr__(self, name):
+        if name in self._methods:
+            return self._methods[name]
+
+        attr = getattr(self._fake, name)
+        if not callable(attr):
+            return attr
+
+        method = self._profile.time_provider(attr, name)
+        self._methods[name] = method
+        return method
+
+def _provider_key(method, name):
+    """Report key for a provider method, e.g. "person.name" """
+    module = type(getattr(method, "__self__", None)).__module__
+    parts = module.split(".")
+    if len(parts) > 2 and parts[:2] == ["faker", "providers"]:
+        return f"{parts[2]}.{name}"
+    return name
@@ -0,0 +1,435 @@
+"""
+Multi-table generation with foreign keys.
+
+A relational schema lists tables, parents first. The first table is the
+root and has a fixed row count; every other table names a parent and a
+fan-out distribution giving the number of child rows per parent row:
+
+    {
+      "tables": [
+        {"name": "users", "count": 10000, "key": {"name": "id"},
+         "fields": [{"name": "email", "type": "Email", "unique": true}]},
+        {"name": "orders", "parent": "users", "foreign_key": "user_id",
+         "fan_out": {"distribution": "poisson", "mean": 3},
+         "key": {"name": "id", "type": "uuid"},
+         "fields": [{"name": "placed", "type": "Date of Birth"}]},
+        {"name": "order_items", "parent": "orders", "foreign_key": "order_id",
+         "fan_out": {"distribution": "uniform", "min": 1, "max": 5},
+         "fields": [{"name": "quantity", "type": "Number"}]}
+      ]
+    }
+
+Keys are either sequential integers ("sequential", the default, numbered
+from "start") or UUIDs derived from the run seed and row index ("uuid").
+Children are generated together with each chunk of root rows, from the
+parent keys of that chunk only, so no table is ever held in memory in
+full. Every table has its own GeneratorContext, reseeded per chunk, so a
+seed reproduces the whole dataset.
+
+Fan-out distributions: a plain number (constant), or a mapping with
+"distribution" set to "constant" ("value"), "uniform" ("min", "max"),
+"poisson" ("mean") or "weights" (a mapping of child count to weight).
+"""
+
+import contextlib
+import hashlib
+import itertools
+import math
+import os
+import random
+import time
+import uuid
+
+from data_generator import (
+    DEFAULT_CHUNK_SIZE, GenerationCancelled, GeneratorContext, Progress, compile_schema, derive_seed,
+    generate_sequential_id, read_schema_file,
+)
+from uniqueness import UniqueTracker
+
+KEY_TYPES = ("sequential", "uuid")
+
+# Field types used for key columns by the writers that need types
+KEY_FIELD_TYPES = {"sequential": "Number", "uuid": "UUID"}
+
+FAN_OUT_DISTRIBUTIONS = ("constant", "uniform", "poisson", "weights")
+
+# Largest mean drawn with Knuth's method in one go (see _poisson)
+POISSON_STEP = 500
+
+class Table:
+    """One table of a relational schema, compiled for generation"""
+
+    def __init__(self, spec, parent=None, seed=None, locale=None):
+        self.name = spec.get("name")
+        if not self.name:
+            raise ValueError("Every table needs a name")
+
+        self.parent = parent
+        self.seed = seed
+        self.key_name, self.key_type, key_start = self._parse_key(spec.get("key"))
+        self.foreign_key = spec.get("foreign_key")
+        self.count = spec.get("count")
+        self.fan_out = None
+
+        if parent is None:
+            if not isinstance(self.count, int) or isinstance(self.count, bool) or self.count <= 0:
+                raise ValueError(f"Root table '{self.name}' needs a positive 'count'")
+        else:
+            if parent.key_name is None:
+                raise ValueError(f"Table '{parent.name}' needs a key to be a parent")
+            if not self.foreign_key:
+                raise ValueError(f"Table '{self.name}' needs a 'foreign_key' column name")
+            self.fan_out = fan_out_sampler(spec.get("fan_out", 1), self.name)
+
+        fields = spec.get("fields") or []
+        generated = [name for name in (self.key_name, self.foreign_key) if name]
+        for field in fields:
+            if field.get("name") in generated:
+                raise ValueError(f"Field '{field['name']}' of table '{self.name}' clashes with a key column")
+
+        table_seed = None if seed is None else derive_seed(seed, f"table:{self.name}")
+        self.context = GeneratorContext(seed=table_seed, locale=locale)
+        self.schema = compile_schema(fields, self.context) if fields else None
+        self.tracker = UniqueTracker.for_fields(fields)
+        self.fields = self._key_fields() + [dict(field) for field in fields]
+        self.rows_done = 0
+        self._ids = generate_sequential_id(key_start)
+
+    def _parse_key(self, key):
+        """Return (name, type, start) of the key column, or Nones if there is no key"""
+        if key is None:
+            return None, None, 1
+        if isinstance(key, str):
+            key = {"name": key}
+        if not isinstance(key, dict):
+            raise ValueError(f"The key of table '{self.name}' must be a name or a mapping")
+        key_type = key.get("type", "sequential")
+        if not key.get("name"):
+            raise ValueError(f"The key of table '{self.name}' needs a name")
+        if key_type not in KEY_TYPES:
+            raise ValueError(f"Key type of table '{self.name}' must be one of: {', '.join(KEY_TYPES)}")
+        start = key.get("start", 1)
+        if not isinstance(start, int) or isinstance(start, bool):
+            raise ValueError(f"Key start of table '{self.name}' must be a whole number")
+        return key["name"], key_type, start
+
+    def _key_fields(self):
+        """Field definitions of the key and foreign key columns"""
+        fields = []
+        if self.key_name:
+            fields.append({"name": self.key_name, "type": KEY_FIELD_TYPES[self.key_type]})
+        if self.foreign_key:
+            fields.append({"name": self.foreign_key, "type": KEY_FIELD_TYPES[self.parent.key_type]})
+        return fields
+
+    def make_keys(self, count):
+        """Keys for the next `count` rows of the table"""
+        if self.key_type == "uuid":
+            start = self.rows_done
+            return [self._uuid_key(index) for index in range(start, start + count)]
+        return list(itertools.islice(self._ids, count))
+
+    def _uuid_key(self, index):
+        """UUID key of row `index`, derived from the seed so it can be recomputed"""
+        digest = hashlib.blake2b(f"{self.seed}:{self.name}:{index}".encode(), digest_size=16).digest()
+        return str(uuid.UUID(bytes=digest, version=4))
+
+    def build_chunk(self, chunk_index, count, parent_keys=None):
+        """
+        Generate the table's rows for one chunk of the run.
+
+        Args:
+            chunk_index (int): Index of the root chunk
+            count (int): Number of rows, for the root table
+            parent_keys (list): Keys of the parent rows generated in this
+                chunk, for child tables
+
+        Returns:
+            tuple: (rows, keys) where keys are the new rows' keys (or None)
+        """
+        self.context.seed_chunk(chunk_index)
+
+        foreign_keys = None
+        if parent_keys is not None:
+            sample = self.fan_out
+            rng = self.context.random
+            foreign_keys = [key for key in parent_keys for _ in range(sample(rng))]
+            count = len(foreign_keys)
+
+        if self.schema is not None and count:
+            rows = self.schema.build_rows(count)
+        else:
+            rows = [{} for _ in range(count)]
+
+        keys = None
+        if self.key_name:
+            keys = self.make_keys(count)
+        self.rows_done += count
+
+        # Key columns come first
+        prefix = [
+            (name, values) for name, values in ((self.key_name, keys), (self.foreign_key, foreign_keys))
+            if name
+        ]
+        if prefix:
+            names = [name for name, _ in prefix]
+            rows = [
+                dict(zip(names, key_values), **row)
+                for row, key_values in zip(rows, zip(*[values for _, values in prefix]))
+            ]
+
+        if self.tracker is not None:
+            self.tracker.apply(rows)
+        return rows, keys
+
+def fan_out_sampler(spec, table_name):
+    """
+    Build a function drawing a child row count from a random.Random.
+
+    Args:
+        spec: A non-negative number, or a distribution mapping (see module
+            docstring)
+        table_name (str): Table the fan-out belongs to, for error messages
+
+    Returns:
+        callable: Function taking a random.Random and returning an int
+    """
+    if isinstance(spec, int) and not isinstance(spec, bool):
+        spec = {"distribution": "constant", "value": spec}
+    if not isinstance(spec, dict):
+        raise ValueError(f"Invalid fan_out for table '{table_name}'")
+
+    distribution = spec.get("distribution", "constant")
+    try:
+        if distribution == "constant":
+            value = int(spec["value"])
+            if value < 0:
+                raise ValueError
+            return lambda rng: value
+
+        if distribution == "uniform":
+            low, high = int(spec["min"]), int(spec["max"])
+            if low < 0 or high < low:
+                raise ValueError
+            return lambda rng: rng.randint(low, high)
+
+        if distribution == "poisson":
+            mean = float(spec["mean"])
+            if not 0 <= mean < math.inf:
+                raise ValueError
+            return lambda rng: _poisson(rng, mean)
+
+        if distribution == "weights":
+            counts = [int(count) for count in spec["weights"]]
+            weights = [float(weight) for weight in spec["weights"].values()]
+            if not counts or min(counts) < 0 or min(weights) < 0 or not sum(weights):
+                raise ValueError
+            return lambda rng: rng.choices(counts, weights)[0]
+
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise ValueError(f"Invalid {distribution} fan_out for table '{table_name}'")
+
+    raise ValueError(
+        f"fan_out distribution of table '{table_name}' must be one of: {', '.join(FAN_OUT_DISTRIBUTIONS)}"
+    )
+
+def _poisson(rng, mean):
+    """
+    Draw from a Poisson distribution.
+
+    Knuth's method needs exp(-mean), which underflows to 0.0 for means past
+    about 745, so larger means are drawn as a sum of draws with means of at
+    most POISSON_STEP (a sum of Poisson variables is Poisson distributed).
+    """
+    count = 0
+    while mean > POISSON_STEP:
+        count += _knuth_poisson(rng, POISSON_STEP)
+        mean -= POISSON_STEP
+    return count + _knuth_poisson(rng, mean)
+
+def _knuth_poisson(rng, mean):
+    """Draw from a Poisson distribution with Knuth's method, for small means"""
+    limit = math.exp(-mean)
+    count = 0
+    product = rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+class RelationalSchema:
+    """
+    A list of related tables, compiled for generation.
+
+    `count`, if given, replaces the root table's row count.
+    """
+
+    def __init__(self, spec, seed=None, locale=None, count=None):
+        if isinstance(spec, dict):
+            spec = spec.get("tables")
+        if not isinstance(spec, list) or not spec:
+            raise ValueError("A relational schema needs a non-empty list of tables")
+
+        self.tables = []
+        by_name = {}
+        for index, table_spec in enumerate(spec):
+            if not isinstance(table_spec, dict):
+                raise ValueError(f"Table {index + 1} of the schema must be a mapping")
+            if index == 0 and count is not None:
+                table_spec = dict(table_spec, count=count)
+            parent_name = table_spec.get("parent")
+            if index == 0 and parent_name:
+                raise ValueError("The first table must be the root table, without a parent")
+            if index > 0 and parent_name not in by_name:
+                raise ValueError(
+                    f"Table '{table_spec.get('name')}' needs a 'parent' listed before it"
+                )
+
+            table = Table(table_spec, by_name.get(parent_name), seed, locale)
+            if table.name in by_name:
+                raise ValueError(f"Duplicate table name: {table.name}")
+            by_name[table.name] = table
+            self.tables.append(table)
+
+    @property
+    def root(self):
+        return self.tables[0]
+
+def load_relational_schema(path):
+    """
+    Load a relational schema (a mapping with a "tables" list) from a JSON or
+    YAML file.
+
+    Returns:
+        dict: The schema specification
+    """
+    spec = read_schema_file(path)
+    if not isinstance(spec, dict) or not isinstance(spec.get("tables"), list):
+        raise ValueError(f"Schema file {path} must contain a 'tables' list")
+    return spec
+
+def is_relational_schema(spec):
+    """True if a parsed schema document describes several tables"""
+    return isinstance(spec, dict) and "tables" in spec
+
+def iter_relational_chunks(spec, seed=None, locale=None, chunk_size=DEFAULT_CHUNK_SIZE, cancel=None):
+    """
+    Lazily generate a relational dataset, one chunk of root rows at a time.
+
+    Args:
+        spec (dict): Relational schema (see module docstring)
+        seed (int): Seed for a reproducible dataset; a random one is
+            chosen if omitted
+        locale (str): Faker locale
+        chunk_size (int): Root rows per chunk; child chunks are this times
+            their fan-out
+        cancel (CancellationToken): Token to stop the run early
+
+    Returns:
+        iterator: Iterator over {table name: list of rows} dictionaries
+    """
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be a positive number")
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+
+    schema = RelationalSchema(spec, seed, locale)
+    return _generate_relational(schema, chunk_size, cancel)
+
+def _generate_relational(schema, chunk_size, cancel):
+    """Generator backing iter_relational_chunks"""
+    root = schema.root
+    remaining = root.count
+    chunk_index = 0
+    while remaining > 0:
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+
+        size = min(chunk_size, remaining)
+        remaining -= size
+
+        chunk = {}
+        keys = {}
+        for table in schema.tables:
+            parent_keys = None if table.parent is None else keys[table.parent.name]
+            chunk[table.name], keys[table.name] = table.build_chunk(chunk_index, size, parent_keys)
+
+        chunk_index += 1
+        yield chunk
+
+def export_relational(spec, output, export_format, seed=None, locale=None,
+                      chunk_size=DEFAULT_CHUNK_SIZE, progress=None, cancel=None, count=None,
+                      **options):
+    """
+    Generate a relational dataset and export each table to its own file or
+    database table.
+
+    File formats write `<output>/<table><ext>`; the database formats load
+    every table into the database at `output`. If the run is cancelled the
+    output files are removed and GenerationCancelled is raised.
+
+    Args:
+        spec (dict): Relational schema (see module docstring)
+        output (str): Output directory, or database file / URL
+        export_format (str): One of the keys in EXPORT_FORMATS, or
+            "PostgreSQL"
+        seed (int): Seed for a reproducible dataset
+        locale (str): Faker locale
+        chunk_size (int): Root rows per chunk
+        progress (callable): Called with a data_generator.Progress, counting
+            root rows, after every chunk
+        cancel (CancellationToken): Token to stop the run early
+        count (int): Number of root rows, replacing the root table's
+            'count'
+        **options: Format specific writer options
+
+    Returns:
+        dict: Number of records written per table
+    """
+    from exporters import DATABASE_FORMATS, EXPORT_FORMATS, WRITE_BUFFER_SIZE, open_writer, writer_class
+
+    writer_class(export_format)  # Fail on unknown formats before creating any output
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+    schema = RelationalSchema(spec, seed, locale, count)
+    chunks = _generate_relational(schema, chunk_size, cancel)
+
+    paths = []
+    try:
+        with contextlib.ExitStack() as stack:
+            writers = {}
+            if export_format in DATABASE_FORMATS:
+                import databases
+                connection = databases.connect(output, export_format)
+                stack.callback(connection.close)
+                table_writer = databases.writer_class(export_format)
+                for table in schema.tables:
+                    writers[table.name] = stack.enter_context(
+                        table_writer(connection, table.fields, table=table.name, **options)
+                    )
+            else:
+                os.makedirs(output, exist_ok=True)
+                for table in schema.tables:
+                    path = os.path.join(output, table.name + EXPORT_FORMATS[export_format])
+                    paths.append(path)
+                    f = stack.enter_context(open(path, 'wb', buffering=WRITE_BUFFER_SIZE))
+                    writers[table.name] = stack.enter_context(
+                        open_writer(f, export_format, table.fields, **options)
+                    )
+
+            start = time.perf_counter()
+            root_done = 0
+            for chunk in chunks:
+                for name, rows in chunk.items():
+                    writers[name].write_chunk(rows)
+                root_done += len(chunk[schema.root.name])
+                if progress is not None:
+                    progress(Progress(root_done, schema.root.count, time.perf_counter() - start))
+
+    except GenerationCancelled:
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    return {name: writer.records_written for name, writer in writers.items()}
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Local HTTP generation service.
+
+Starting Python, importing Faker and building its providers costs more
+than generating a few thousand records, so test suites that each start the
+generator pay mostly for start-up. This service stays up instead: a
+persistent pool of worker processes keeps its Faker instances (with their
+providers loaded) from one request to the next.
+
+    python service.py --port 8765
+    curl -d '{"fields": [{"name": "email", "type": "Email"}], "count": 1000, "seed": 42}' \\
+        http://127.0.0.1:8765/generate
+
+Endpoints:
+
+* `POST /generate` takes a JSON body with "fields" (field definitions, as
+  in a schema file), "count", and optionally "seed", "locale" and "format"
+  ("jsonl", the default, or "csv"). The records are streamed back with
+  chunked transfer encoding, one chunk per shard as the workers finish
+  them, so the first rows arrive before the last are generated. The
+  output is the same as `main.py --headless` with the same seed; the seed
+  used is returned in the X-Seed header.
+* `GET /types` lists the supported field types.
+* `GET /stats` reports the worker count and cache usage.
+
+Seeded results are kept in an LRU cache of encoded responses, so repeating
+a (schema, seed, count) request is served without generating anything.
+
+The server is plain asyncio with no dependencies beyond the generator's
+own; it listens on 127.0.0.1 unless told otherwise.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from data_generator import DEFAULT_CHUNK_SIZE, FIELD_TYPES, GeneratorContext, validate_fields
+from exporters import open_writer
+from locales import parse_locales
+from parallel import dispatch_shards, generate_shard, plan_shards
+from uniqueness import UniqueTracker
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Bytes of encoded responses kept in the result cache
+DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+
+# Largest request body accepted
+MAX_BODY_SIZE = 1024 * 1024
+
+# Output formats, mapped to the export format and content type
+SERVICE_FORMATS = {
+    "jsonl": ("JSON Lines", "application/x-ndjson"),
+    "csv": ("CSV", "text/csv; charset=utf-8"),
+}
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+class RequestError(Exception):
+    """A request the service can't serve, answered with `status`"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class ResultCache:
+    """
+    LRU cache of encoded responses, bounded by their total size.
+
+    Args:
+        max_bytes (int): Total size of the cached responses; responses
+            larger than this are not cached
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_SIZE):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached response parts for `key`, or None"""
+        parts = self._entries.get(key)
+        if parts is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return parts
+
+    def put(self, key, parts):
+        """Cache a response, evicting the least recently used ones to fit it"""
+        size = sum(len(part) for part in parts)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.size -= sum(len(part) for part in self._entries.pop(key))
+        while self.size + size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= sum(len(part) for part in evicted)
+        self._entries[key] = parts
+        self.size += size
+
+def encode_records(records, fields, export_format, offset):
+    """
+    Encode one shard of records as it appears in the full output.
+
+    Args:
+        records (list): The shard's records
+        fields (list): Field definitions
+        export_format (str): "JSON Lines" or "CSV"
+        offset (int): Number of records before the shard; the CSV header
+            is only written for the first shard
+
+    Returns:
+        bytes: The encoded records
+    """
+    buffer = io.BytesIO()
+    writer = open_writer(buffer, export_format, fields)
+    writer.resume(offset)
+    writer.write_chunk(records)
+    return buffer.getvalue()
+
+def encode_shard(fields, shard_index, count, master_seed, locale, export_format, shard_size):
+    """
+    Generate and encode one shard in a worker process.
+
+    Encoding in the worker spreads the encoding over the pool and sends
+    the main process bytes instead of pickled records. `shard_size` is the
+    run's shard size, which places the shard in the output.
+
+    Returns:
+        bytes: The encoded records
+    """
+    records = generate_shard(fields, shard_index, count, master_seed, locale)
+    return encode_records(records, fields, export_format, shard_index * shard_size)
+
+def _warm_worker(locale):
+    """
+    Pool initializer: build a Faker instance with every provider loaded.
+
+    Only the providers are loaded; nothing is generated, as a locale may
+    lack a provider method some type needs (en_PH has no phone numbers),
+    and that should only fail the requests using that type. An exception
+    here would break the whole pool, so a type that fails to load is
+    skipped and left to fail in the request that uses it.
+
+    Closing the context hands the instances back to the process's cache
+    (see locales.py), where the first request's context picks them up.
+    """
+    context = GeneratorContext(seed=0, locale=locale)
+    if context.multilocale:
+        contexts = [context.locale_context(name) for name, _ in context.locale_weights]
+    else:
+        contexts = [context]
+    for child in contexts:
+        for field_type in FIELD_TYPES:
+            try:
+                child.load_providers(field_type)
+            except Exception:
+                pass
+    context.close()
+
+class GenerationService:
+    """
+    The HTTP service and its worker pool.
+
+    Use `serve_forever` to run it in the current thread, or `start` and
+    `stop` to run it in a background thread, e.g. from a test fixture.
+
+    Args:
+        workers (int): Worker processes, defaults to the CPU count
+        shard_size (int): Records per shard, and so per response chunk;
+            the output for a seed depends on it, as it does on the CLI's
+            --chunk-size
+        cache_size (int): Bytes of responses kept in the result cache
+        locale (str): Locale the workers warm up for; requests may use
+            any locale
+    """
+
+    def __init__(self, workers=None, shard_size=DEFAULT_CHUNK_SIZE, cache_size=DEFAULT_CACHE_SIZE,
+                 locale=None):
+        if shard_size <= 0:
+            raise ValueError("Shard size must be a positive number")
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.locale = locale
+        self.cache = ResultCache(cache_size)
+        self.executor = None
+        self.server = None
+        self._connections = set()
+        self._loop = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL of the running service"""
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def open(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start the worker pool and listen; port 0 picks a free port"""
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker,
+                                            initargs=(self.locale,))
+        # Get the workers started (and warming up) before the first request
+        await asyncio.wrap_future(self.executor.submit(int))
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+
+    async def close(self):
+        """Stop listening and shut the worker pool down"""
+        if self.server is not None:
+            self.server.close()
+            # Idle keep-alive connections would otherwise hold wait_closed up
+            for writer in list(self._connections):
+                writer.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Run the service in the current thread until interrupted"""
+        async def run():
+            await self.open(host, port)
+            print(f"Serving on {self.url}", file=sys.stderr)
+            try:
+                await self.server.serve_forever()
+            finally:
+                await self.close()
+
+        try:
+            asyncio.run(run())
+        except KeyboardInterrupt:
+            pass
+
+    def start(self, host=DEFAULT_HOST, port=0):
+        """
+        Run the service in a background thread.
+
+        Returns:
+            str: Base URL of the service
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.open(host, port), self._loop).result()
+        return self.url
+
+    def stop(self):
+        """Stop a service started with `start`"""
+        asyncio.run_coroutine_threadsafe(self.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def stats(self):
+        """Worker and cache figures, as served by GET /stats"""
+        return {
+            "workers": self.workers,
+            "shard_size": self.shard_size,
+            "cache_entries": len(self.cache),
+            "cache_bytes": self.cache.size,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+        }
+
+    async def _handle_connection(self, reader, writer):
+        """Serve the requests of one (keep-alive) connection"""
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except RequestError as e:
+                    await _send_json(writer, {"error": str(e)}, e.status, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._dispatch(writer, method, path, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _dispatch(self, writer, method, path, body, keep_alive):
+        """Route one request"""
+        path = path.split("?", 1)[0]
+        routes = {"/generate": "POST", "/types": "GET", "/stats": "GET"}
+        if path not in routes:
+            await _send_json(writer, {"error": f"Not found: {path}"}, 404, keep_alive)
+        elif method != routes[path]:
+            await _send_json(writer, {"error": f"Use {routes[path]} for {path}"}, 405, keep_alive)
+        elif path == "/types":
+            await _send_json(writer, list(FIELD_TYPES), keep_alive=keep_alive)
+        elif path == "/stats":
+            await _send_json(writer, self.stats(), keep_alive=keep_alive)
+        else:
+            try:
+                await self._generate(writer, body, keep_alive)
+            except RequestError as e:
+                await _send_json(writer, {"error": str(e)}, e.status, keep_alive)
+
+    async def _generate(self, writer, body, keep_alive):
+        """Serve POST /generate"""
+        fields, count, seed, locale, output_format = _parse_generate_request(body)
+        export_format, content_type = SERVICE_FORMATS[output_format]
+        try:
+            validate_fields(fields)
+            locale_key = parse_locales(locale)
+        except ValueError as e:
+            raise RequestError(str(e))
+
+        key = None
+        if seed is not None:
+            key = (json.dumps(fields, sort_keys=True, default=str), count, seed, locale_key,
+                   export_format, self.shard_size)
+        else:
+            seed = random.SystemRandom().getrandbits(63)
+
+        parts = self.cache.get(key) if key is not None else None
+        chunks = _iter_parts(parts) if parts is not None else self._run(fields, count, seed, locale,
+                                                                          export_format)
+        # Wait for the first shard, so a failed run still gets an error status
+        try:
+            first = await anext(chunks)
+        except StopAsyncIteration:
+            first = b""
+        except Exception as e:
+            raise RequestError(f"Error generating data: {e}", 500)
+
+        writer.write(_response_head(200, content_type, keep_alive, chunked=True,
+                                    extra={"X-Seed": str(seed)}))
+        stored = [] if parts is None and key is not None else None
+        size = 0
+        try:
+            part = first
+            while True:
+                if part:
+                    writer.write(b"%x\r\n%s\r\n" % (len(part), part))
+                    await writer.drain()
+                if stored is not None:
+                    stored.append(part)
+                    size += len(part)
+                    if size > self.cache.max_bytes:
+                        stored = None
+                try:
+                    part = await anext(chunks)
+                except StopAsyncIteration:
+                    break
+        except ConnectionError:
+            raise
+        except Exception:
+            # The status line is gone; all that's left is to cut the response short
+            writer.transport.abort()
+            raise ConnectionAbortedError
+        finally:
+            await chunks.aclose()
+
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        if stored is not None:
+            self.cache.put(key, stored)
+
+    async def _run(self, fields, count, seed, locale, export_format):
+        """Generate a run on the worker pool, yielding each shard's output in order"""
+        loop = asyncio.get_running_loop()
+        tracker = UniqueTracker.for_fields(fields)
+        if tracker is None:
+            task = partial(encode_shard, fields, master_seed=seed, locale=locale,
+                           export_format=export_format, shard_size=self.shard_size)
+        else:
+            # Unique fields are made unique across shards here, in shard order
+            task = partial(generate_shard, fields, master_seed=seed, locale=locale)
+        futures = dispatch_shards(self.executor, plan_shards(count, self.shard_size), task,
+                                  self.workers * 2)
+
+        try:
+            for shard_index, future in futures:
+                result = await asyncio.wrap_future(future)
+                if tracker is not None:
+                    offset = shard_index * self.shard_size
+                    result = await loop.run_in_executor(
+                        None, lambda: encode_records(tracker.apply(result), fields, export_format, offset)
+                    )
+                yield result
+
+        finally:
+            # The client went away or the run failed; drop the queued shards
+            futures.close()
+
+async def _iter_parts(parts):
+    """Replay a cached response"""
+    for part in parts:
+        yield part
+
+def _parse_generate_request(body):
+    """
+    Validate the body of a POST /generate request.
+
+    Returns:
+        tuple: (fields, count, seed, locale, output format)
+    """
+    try:
+        request = json.loads(body or b"null")
+    except ValueError as e:
+        raise RequestError(f"Invalid JSON: {e}")
+    if not isinstance(request, dict):
+        raise RequestError("Expected a JSON object with 'fields' and 'count'")
+
+    fields = request.get("fields")
+    if not isinstance(fields, list) or not fields or not all(isinstance(field, dict) for field in fields):
+        raise RequestError("'fields' must be a non-empty list of field definitions")
+
+    count = request.get("count")
+    if isinstance(count, bool) or not isinstance(count, int) or count <= 0:
+        raise RequestError("'count' must be a positive number")
+
+    seed = request.get("seed")
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+        raise RequestError("'seed' must be an integer")
+
+    output_format = str(request.get("format", "jsonl")).lower()
+    if output_format not in SERVICE_FORMATS:
+        raise RequestError(f"'format' must be one of: {', '.join(SERVICE_FORMATS)}")
+
+    return fields, count, seed, request.get("locale"), output_format
+
+async def _read_request(reader):
+    """
+    Read one HTTP/1.1 request.
+
+    Returns:
+        tuple: (method, path, headers, body), or None once the client has
+            closed the connection
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise RequestError("Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, sep, value = line.decode("latin-1").partition(":")
+        if not sep:
+            raise RequestError("Malformed header")
+        headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise RequestError("Chunked request bodies aren't supported", 411)
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise RequestError("Invalid Content-Length")
+    if length > MAX_BODY_SIZE:
+        raise RequestError(f"Request body over {MAX_BODY_SIZE} bytes", 413)
+    body = await reader.readexactly(length) if length > 0 else b""
+    return method.upper(), path, headers, body
+
+def _response_head(status, content_type, keep_alive, length=None, chunked=False, extra=None):
+    """Status line and headers of a response"""
+    headers = {"Content-Type": content_type}
+    if chunked:
+        headers["Transfer-Encoding"] = "chunked"
+    else:
+        headers["Content-Length"] = str(length)
+    headers["Connection"] = "keep-alive" if keep_alive else "close"
+    headers.update(extra or {})
+    lines = [f"HTTP/1.1 {status} {HTTP_REASONS[status]}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+async def _send_json(writer, value, status=200, keep_alive=True):
+    """Send a complete JSON response"""
+    body = json.dumps(value).encode("utf-8")
+    writer.write(_response_head(status, "application/json", keep_alive, len(body)) + body)
+    await writer.drain()
+
+def build_parser():
+    """Create the argument parser"""
+    parser = argparse.ArgumentParser(
+        prog="service.py",
+        description="Serve generated data over HTTP from a pool of warm worker processes.",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"records per shard and response chunk (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE // (1024 * 1024),
+                        help="megabytes of responses to cache (default: %(default)s)")
+    parser.add_argument("--locale", help="locale to warm the workers up for, e.g. de_DE")
+    return parser
+
+def main(argv=None):
+    """
+    Run the service until interrupted.
+
+    Args:
+        argv (list): Command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: Exit code (0 for success, non-zero for errors)
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        parse_locales(args.locale)
+        service = GenerationService(args.workers, args.shard_size, args.cache_size * 1024 * 1024,
+                                    args.locale)
+        service.serve_forever(args.host, args.port)
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Vectorized column generators backed by NumPy.
+
+Cheap field types such as "Number" and "UUID" spend most of their time in
+per-value Python overhead. When NumPy is installed, these types are
+produced a whole column at a time instead: integer and boolean arrays,
+random 16-byte blocks formatted as UUIDs, and day offsets turned into ISO
+dates. Every column is returned as a plain Python list so records still
+serialize like the scalar path's.
+
+NumPy is optional; without it `HAVE_NUMPY` is False and generation uses
+the scalar generators only. It is imported on first use rather than with
+this module, so runs that never vectorize a column don't pay for it.
+"""
+
+import functools
+import importlib.util
+from datetime import date, timedelta
+
+HAVE_NUMPY = importlib.util.find_spec("numpy") is not None
+
+# Where the 32 hex digits land in the 36-character UUID string
+_UUID_DIGIT_POSITIONS = [i for i in range(36) if i not in (8, 13, 18, 23)]
+
+@functools.lru_cache(maxsize=None)
+def _uuid_tables():
+    """Lowercase hex digits indexed by nibble value, and the digit positions, as arrays"""
+    import numpy as np
+    return np.frombuffer(b"0123456789abcdef", dtype=np.uint8), np.array(_UUID_DIGIT_POSITIONS)
+
+def new_rng(seed=None):
+    """
+    Create a NumPy random generator.
+
+    Args:
+        seed (int): Seed, or None to seed from OS entropy
+
+    Returns:
+        numpy.random.Generator: The generator
+    """
+    import numpy as np
+    return np.random.default_rng(seed)
+
+def birth_date_range(minimum_age=18, maximum_age=90):
+    """
+    Return the (first, last) possible birth dates for an age range.
+
+    Matches Faker's `date_of_birth`, which draws from the year after the
+    maximum age up to today minus the minimum age.
+    """
+    today = date.today()
+    start = _change_year(today, -(maximum_age + 1)) + timedelta(days=1)
+    end = _change_year(today, -minimum_age)
+    return start, end
+
+def _change_year(current, years):
+    """Shift a date by whole years, rolling Feb 29 forward to Mar 1"""
+    try:
+        return current.replace(year=current.year + years)
+    except ValueError:
+        return current.replace(year=current.year + years, month=3, day=1)
+
+def number_column(rng, count, minimum=1, maximum=1000):
+    """Generate `count` integers between minimum and maximum inclusive"""
+    return rng.integers(minimum, maximum, size=count, endpoint=True).tolist()
+
+def boolean_column(rng, count):
+    """Generate `count` booleans"""
+    return (rng.integers(0, 2, size=count) == 1).tolist()
+
+def uuid_column(rng, count):
+    """Generate `count` random (version 4) UUID strings"""
+    import numpy as np
+    hex_digits, digit_positions = _uuid_tables()
+    raw = np.frombuffer(rng.bytes(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+
+    # Set the version and variant bits, as uuid.UUID(version=4) does
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+
+    digits = np.empty((count, 32), dtype=np.uint8)
+    digits[:, 0::2] = hex_digits[raw >> 4]
+    digits[:, 1::2] = hex_digits[raw & 0x0F]
+
+    text = np.full((count, 36), ord("-"), dtype=np.uint8)
+    text[:, digit_positions] = digits
+    return text.view("S36").ravel().astype("U36").tolist()
+
+def date_of_birth_column(rng, count, minimum_age=18, maximum_age=90):
+    """Generate `count` ISO formatted birth dates for an age range"""
+    import numpy as np
+    start, end = birth_date_range(minimum_age, maximum_age)
+    offsets = rng.integers(0, (end - start).days, size=count, endpoint=True)
+    dates = np.datetime64(start, "D") + offsets
+    return np.datetime_as_string(dates, unit="D").tolist()
+
+def column_generators(context):
+    """
+    Build the field type -> column function table for a context.
+
+    Each column function takes a row count and returns a list of values.
+
+    Args:
+        context (GeneratorContext): Context whose NumPy generator is used
+
+    Returns:
+        dict: Column functions for the vectorizable field types
+    """
+    def rng():
+        # Looked up per call, because reseeding replaces the generator
+        return context.numpy_random
+
+    return {
+        "Number": lambda count: number_column(rng(), count),
+        "Boolean": lambda count: boolean_column(rng(), count),
+        "UUID": lambda count: uuid_column(rng(), count),
+        "Date of Birth": lambda count: date_of_birth_column(rng(), count),
+    }
+
+def parameterized_column(context, field_type, params):
+    """
+    Build a column function for a field type with parameters.
+
+    Args:
+        context (GeneratorContext): Context whose NumPy generator is used
+        field_type (str): Type of the field
+        params (dict): Parameters as returned by data_generator.resolve_params
+
+    Returns:
+        callable: Column function, or None if the type isn't vectorized
+    """
+    if field_type == "Number":
+        minimum, maximum = params["min"], params["max"]
+        return lambda count: number_column(context.numpy_random, count, minimum, maximum)
+
+    if field_type == "Date of Birth":
+        minimum_age, maximum_age = params["min_age"], params["max_age"]
+        return lambda count: date_of_birth_column(context.numpy_random, count, minimum_age, maximum_age)
+
+    return None